@@ -1,5 +1,26 @@
 from django.contrib import admin
-from .models import UserProfile, MenuItem, Order, OrderItem, Reservation
+from .models import UserProfile, MenuItem, Order, OrderItem, Reservation, DailySales, DailyItemSales, MenuItemRanking, MenuItemPairing, ArchivedOrder, ArchivedOrderItem
+from .status_updates import bulk_update_order_status, bulk_update_reservation_status
+
+
+def order_status_action(status, label):
+    """Build an admin action that moves the selected orders to status"""
+    @admin.action(description=f'Mark selected orders as {label}')
+    def action(modeladmin, request, queryset):
+        updated = bulk_update_order_status(queryset, status)
+        modeladmin.message_user(request, f'{updated} order(s) marked as {label}.')
+    action.__name__ = f'mark_orders_{status}'
+    return action
+
+
+def reservation_status_action(status, label):
+    """Build an admin action that moves the selected reservations to status"""
+    @admin.action(description=f'Mark selected reservations as {label}')
+    def action(modeladmin, request, queryset):
+        updated = bulk_update_reservation_status(queryset, status)
+        modeladmin.message_user(request, f'{updated} reservation(s) marked as {label}.')
+    action.__name__ = f'mark_reservations_{status}'
+    return action
 
 
 @admin.register(UserProfile)
@@ -30,6 +51,12 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ['order_number', 'user__username', 'user__email']
     readonly_fields = ['order_number', 'created_at', 'updated_at']
     inlines = [OrderItemInline]
+    actions = [
+        order_status_action('preparing', 'Preparing'),
+        order_status_action('ready', 'Ready for Collection'),
+        order_status_action('completed', 'Completed'),
+        order_status_action('cancelled', 'Cancelled'),
+    ]
     
     fieldsets = (
         ('Order Information', {
@@ -56,6 +83,12 @@ class ReservationAdmin(admin.ModelAdmin):
     list_filter = ['status', 'date', 'created_at']
     search_fields = ['reservation_number', 'user__username', 'user__email']
     readonly_fields = ['reservation_number', 'created_at', 'updated_at']
+    actions = [
+        reservation_status_action('confirmed', 'Confirmed'),
+        reservation_status_action('completed', 'Completed'),
+        reservation_status_action('cancelled', 'Cancelled'),
+        reservation_status_action('no_show', 'No Show'),
+    ]
     
     fieldsets = (
         ('Reservation Information', {
@@ -68,3 +101,50 @@ class ReservationAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at')
         }),
     )
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(admin.ModelAdmin):
+    list_display = ['date', 'order_type', 'order_count', 'revenue']
+    list_filter = ['order_type', 'date']
+    date_hierarchy = 'date'
+
+
+@admin.register(DailyItemSales)
+class DailyItemSalesAdmin(admin.ModelAdmin):
+    list_display = ['date', 'menu_item', 'quantity', 'revenue', 'order_count']
+    list_filter = ['date']
+    search_fields = ['menu_item__name']
+    date_hierarchy = 'date'
+    list_select_related = ['menu_item']
+
+
+@admin.register(MenuItemRanking)
+class MenuItemRankingAdmin(admin.ModelAdmin):
+    list_display = ['menu_item', 'score', 'quantity', 'updated_at']
+    list_select_related = ['menu_item']
+
+
+@admin.register(MenuItemPairing)
+class MenuItemPairingAdmin(admin.ModelAdmin):
+    list_display = ['menu_item', 'paired_item', 'count']
+    search_fields = ['menu_item__name', 'paired_item__name']
+    list_select_related = ['menu_item', 'paired_item']
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    readonly_fields = ['menu_item', 'quantity', 'price']
+    can_delete = False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ['order_number', 'user', 'order_type', 'status', 'total', 'created_at', 'archived_at']
+    list_filter = ['status', 'order_type', 'created_at']
+    search_fields = ['order_number', 'user__username', 'user__email', 'guest_email']
+    inlines = [ArchivedOrderItemInline]
+
+    def has_change_permission(self, request, obj=None):
+        return False
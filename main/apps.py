@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class MainConfig(AppConfig):
     name = 'main'
+
+    def ready(self):
+        # Register the maintenance jobs defined outside main.maintenance, and the signal handlers
+        from . import archive, rankings, signals  # noqa: F401
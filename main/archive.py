@@ -0,0 +1,74 @@
+"""
+Order Archive
+Keep Order/OrderItem small by moving old completed and cancelled orders
+into ArchivedOrder/ArchivedOrderItem.
+
+The archive_orders maintenance job moves ARCHIVE_ORDERS_AFTER_DAYS-old
+orders in chunks. Each chunk is copied and deleted in one transaction and
+the copy ignores rows that already exist, so an interrupted run simply
+resumes where it stopped. Archived rows keep their original ids, which
+means the two tables never collide.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+
+from .maintenance import DEFAULT_CHUNK_SIZE, maintenance_job
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+ARCHIVABLE_STATUSES = ('completed', 'cancelled')
+
+
+def archive_order_ids(order_ids):
+    """Move the given orders and their lines into the archive in one transaction"""
+    with transaction.atomic():
+        orders = list(Order.objects.filter(pk__in=order_ids).values())
+        lines = list(OrderItem.objects.filter(order_id__in=order_ids).values())
+        ArchivedOrder.objects.bulk_create([ArchivedOrder(**row) for row in orders], ignore_conflicts=True)
+        ArchivedOrderItem.objects.bulk_create([ArchivedOrderItem(**row) for row in lines], ignore_conflicts=True)
+        OrderItem.objects.filter(order_id__in=order_ids).delete()
+        Order.objects.filter(pk__in=order_ids).delete()
+    return len(orders)
+
+
+@maintenance_job('archive_orders')
+def archive_orders(chunk_size=DEFAULT_CHUNK_SIZE, pause=0):
+    """Archive completed/cancelled orders older than ARCHIVE_ORDERS_AFTER_DAYS"""
+    days = getattr(settings, 'ARCHIVE_ORDERS_AFTER_DAYS', 180)
+    candidates = Order.objects.filter(
+        status__in=ARCHIVABLE_STATUSES,
+        created_at__lt=timezone.now() - timedelta(days=days),
+    ).order_by('pk')
+
+    total = 0
+    while True:
+        ids = list(candidates.values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            break
+        total += archive_order_ids(ids)
+        if len(ids) < chunk_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return total
+
+
+def get_order_or_archived(**lookup):
+    """Find an order in the live table, then in the archive, or raise Http404"""
+    for model in (Order, ArchivedOrder):
+        order = model.objects.filter(**lookup).first()
+        if order is not None:
+            return order
+    raise Http404('No order matches the given query.')
+
+
+def recent_orders_for(user, limit):
+    """The user's most recent orders across the live table and the archive"""
+    orders = list(Order.objects.filter(user=user)[:limit])
+    if len(orders) < limit:
+        orders += list(ArchivedOrder.objects.filter(user=user)[:limit - len(orders)])
+    return orders
@@ -0,0 +1,327 @@
+"""
+Ordering Funnel Benchmark
+Drive concurrent customer journeys against a running server and report latency.
+
+seed() fills the database the server uses with a catalog, customers and
+order history from the synthetic data generator. run() starts one thread
+per virtual user, each repeating a weighted journey over HTTP:
+
+    order        menu -> menu item -> add to basket (AJAX) -> update basket
+                 -> basket -> checkout -> process payment
+    reservation  reservations page -> book a table
+    admin        dashboard -> orders -> prep queue (staff polling)
+
+Latency is measured client side per step. Queries per request come from
+the server's /metrics endpoint, read before and after the run with the
+benchmark staff account. Results are saved as JSON named after the
+current commit so runs can be compared.
+"""
+import json
+import math
+import os
+import random
+import subprocess
+import threading
+import time
+from datetime import date, timedelta
+
+import requests
+from django.contrib.auth.models import User
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from . import menu_cards
+from .fake_data import FakeDataGenerator
+from .models import MenuItem
+
+STAFF_USERNAME = 'benchmark_staff'
+STAFF_PASSWORD = 'benchmark-staff-password'
+JOURNEYS = {'order': 0.6, 'reservation': 0.25, 'admin': 0.15}
+PERCENTILES = (50, 95, 99)
+
+
+# ==================== SEEDING ====================
+
+def seed(menu_items=40, customers=200, orders=2000, days=90, seed_value=0):
+    """
+    Add a catalog, customers and order history (see main/fake_data.py), plus
+    the staff account the benchmark logs in with
+
+    Returns:
+        dict: Rows created per kind
+    """
+    generator = FakeDataGenerator(seed_value)
+    created = {
+        'menu items': generator.menu(menu_items),
+        'customers': generator.users(customers),
+        'orders': generator.orders(orders, days)[0],
+    }
+    staff, _ = User.objects.get_or_create(username=STAFF_USERNAME, defaults={'is_staff': True})
+    staff.set_password(STAFF_PASSWORD)
+    staff.save()
+    return created
+
+
+# ==================== JOURNEYS ====================
+
+class Journey:
+    """One virtual user: an HTTP session that records the latency of every step"""
+
+    def __init__(self, base_url, results, rng):
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        self.results = results
+        self.rng = rng
+
+    def request(self, step, method, path, data=None, ajax=False):
+        headers = {}
+        if method == 'POST':
+            headers['X-CSRFToken'] = self.session.cookies.get('csrftoken', '')
+            headers['Referer'] = self.base_url + '/'
+        if ajax:
+            headers['X-Requested-With'] = 'XMLHttpRequest'
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, data=data, headers=headers, timeout=30)
+            status = response.status_code
+        except requests.RequestException as e:
+            response, status = None, type(e).__name__
+        self.results.add(step, time.perf_counter() - started, status)
+        return response
+
+    def order(self, menu_item_ids):
+        item_id = self.rng.choice(menu_item_ids)
+        self.request('menu', 'GET', '/menu/')
+        self.request('menu_detail', 'GET', f'/menu/{item_id}/')
+        self.request('add_to_basket', 'POST', f'/add-to-basket/{item_id}/', {'quantity': 1}, ajax=True)
+        self.request('update_basket', 'POST', f'/update-basket/{item_id}/', {'quantity': self.rng.randint(1, 3)}, ajax=True)
+        self.request('basket', 'GET', '/basket/')
+        self.request('checkout', 'GET', '/checkout/')
+        self.request('process_payment', 'POST', '/process-payment/', {
+            'order_type': self.rng.choice(['delivery', 'collection']),
+            'delivery_address': '1 Benchmark Street',
+            'payment_method': 'card',
+            'payment_token': 'TEST_TOKEN',
+            'guest_name': 'Benchmark Guest',
+            'guest_email': 'guest@example.com',
+            'guest_phone': '0123456789',
+        })
+
+    def reservation(self, menu_item_ids):
+        self.request('reservations', 'GET', '/reservations/')
+        day = date.today() + timedelta(days=self.rng.randint(1, 365))
+        self.request('make_reservation', 'POST', '/reservations/', {
+            'date': day.isoformat(),
+            'time': f'{self.rng.randint(12, 21)}:{self.rng.choice(["00", "15", "30", "45"])}',
+            'guests': self.rng.randint(1, 8),
+            'guest_name': 'Benchmark Guest',
+            'guest_email': 'guest@example.com',
+            'guest_phone': '0123456789',
+        })
+
+    def admin(self, menu_item_ids):
+        if not self.session.cookies.get('sessionid'):
+            login(self.session, self.base_url)
+        self.request('admin_dashboard', 'GET', '/admin-dashboard/')
+        self.request('admin_orders', 'GET', '/admin-orders/')
+        self.request('admin_prep_queue', 'GET', '/admin-prep-queue/')
+
+
+def login(session, base_url):
+    """Log the benchmark staff account in on a requests session"""
+    session.get(f'{base_url}/login/', timeout=30)
+    session.post(f'{base_url}/login/', data={
+        'username': STAFF_USERNAME,
+        'password': STAFF_PASSWORD,
+    }, headers={
+        'X-CSRFToken': session.cookies.get('csrftoken', ''),
+        'Referer': f'{base_url}/',
+    }, timeout=30)
+
+
+class Results:
+    """Thread-safe collection of (step, seconds, status)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []
+
+    def add(self, step, seconds, status):
+        with self._lock:
+            self.samples.append((step, seconds, status))
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def _query_counts(base_url):
+    """(requests, queries) per view from the server's /metrics, or {} if unavailable"""
+    session = requests.Session()
+    try:
+        login(session, base_url)
+        text = session.get(f'{base_url}/metrics', timeout=30).text
+    except requests.RequestException:
+        return {}
+    counts = {}
+    for line in text.splitlines():
+        for metric, slot in (('http_request_duration_seconds_count', 0), ('db_queries_total', 1)):
+            if line.startswith(metric + '{'):
+                labels, value = line[len(metric) + 1:].rsplit('} ', 1)
+                view = dict(pair.split('=', 1) for pair in labels.split(',')).get('view', '').strip('"')
+                counts.setdefault(view, [0, 0])[slot] += float(value)
+    return counts
+
+
+def run(base_url, users=10, duration=30, seed_value=0):
+    """
+    Run the journeys for duration seconds with users concurrent virtual users
+
+    Returns:
+        dict: Summary with per-step latency percentiles, throughput and queries per request
+    """
+    menu_item_ids = list(MenuItem.objects.filter(is_available=True).values_list('id', flat=True))
+    if not menu_item_ids:
+        raise ValueError('There are no available menu items, seed the database first')
+
+    results = Results()
+    before = _query_counts(base_url)
+    deadline = time.monotonic() + duration
+    names, weights = zip(*JOURNEYS.items())
+
+    def virtual_user(index):
+        rng = random.Random(f'{seed_value}-{index}')
+        journey = Journey(base_url, results, rng)
+        while time.monotonic() < deadline:
+            getattr(journey, rng.choices(names, weights)[0])(menu_item_ids)
+
+    threads = [threading.Thread(target=virtual_user, args=(index,)) for index in range(users)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    after = _query_counts(base_url)
+
+    steps = {}
+    for step, seconds, status in results.samples:
+        steps.setdefault(step, {'latencies': [], 'errors': 0})
+        steps[step]['latencies'].append(seconds)
+        if not isinstance(status, int) or status >= 400:
+            steps[step]['errors'] += 1
+
+    summary = {'steps': {}, 'users': users, 'duration': round(elapsed, 1)}
+    for step, data in sorted(steps.items()):
+        latencies = sorted(data['latencies'])
+        summary['steps'][step] = {
+            'requests': len(latencies),
+            'errors': data['errors'],
+            **{f'p{p}_ms': round(percentile(latencies, p) * 1000, 1) for p in PERCENTILES},
+        }
+    summary['requests'] = len(results.samples)
+    summary['throughput'] = round(len(results.samples) / elapsed, 1) if elapsed else 0
+
+    queries = {}
+    for view, (requests_after, queries_after) in after.items():
+        requests_before, queries_before = before.get(view, (0, 0))
+        if requests_after > requests_before:
+            queries[view] = round((queries_after - queries_before) / (requests_after - requests_before), 1)
+    summary['queries_per_request'] = queries
+    return summary
+
+
+# ==================== TEMPLATE RENDERING ====================
+
+# A private in-memory cache, so the benchmark never touches the shared one
+_RENDER_CACHES = {'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'menu-card-benchmark',
+}}
+
+
+def _sample_items(count):
+    """Unsaved menu items with ids, enough for rendering cards"""
+    categories = [value for value, _ in MenuItem.CATEGORY_CHOICES]
+    return [
+        MenuItem(
+            id=index + 1,
+            name=f'Sample Dish {index + 1}',
+            description='Slow cooked and finished to order with seasonal vegetables and a rich house sauce. ' * 2,
+            category=categories[index % len(categories)],
+            price='12.50',
+            ingredients='See allergen information',
+            allergens='Gluten, Dairy' if index % 3 else '',
+        )
+        for index in range(count)
+    ]
+
+
+def render_menu_cards(counts=(10, 50, 100, 200), repeat=20, template_name=menu_cards.MENU_CARD):
+    """
+    Median milliseconds to produce count cards, all rendered ('cold', right
+    after a catalog change) and all from the cache ('warm')
+
+    Returns:
+        list: Dicts with count, cold_ms, warm_ms and per item microseconds
+    """
+    request = RequestFactory().get('/menu/')
+    rows = []
+    with override_settings(CACHES=_RENDER_CACHES):
+        for count in counts:
+            items = _sample_items(count)
+            cold, warm = [], []
+            for _ in range(repeat):
+                menu_cards.bump_catalog_version()
+                started = time.perf_counter()
+                menu_cards.menu_cards(request, items, template_name)
+                cold.append(time.perf_counter() - started)
+                started = time.perf_counter()
+                ''.join(menu_cards.menu_cards(request, items, template_name))
+                warm.append(time.perf_counter() - started)
+            cold_ms = percentile(sorted(cold), 50) * 1000
+            warm_ms = percentile(sorted(warm), 50) * 1000
+            rows.append({
+                'count': count,
+                'cold_ms': round(cold_ms, 2),
+                'warm_ms': round(warm_ms, 2),
+                'cold_us_per_item': round(cold_ms * 1000 / count, 1),
+                'warm_us_per_item': round(warm_ms * 1000 / count, 1),
+            })
+    return rows
+
+
+# ==================== RESULTS ====================
+
+def current_commit():
+    """Short hash of the checked out commit, or 'unknown'"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def save_results(summary, directory):
+    """Write summary to directory/<timestamp>-<commit>.json, returns the path"""
+    summary = {**summary, 'commit': current_commit(), 'created_at': timezone.now().isoformat()}
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{timezone.now():%Y%m%d-%H%M%S}-{summary['commit']}.json")
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    return path
+
+
+def latest_results(directory, exclude=None):
+    """Path of the newest saved run in directory (other than exclude), or None"""
+    if not os.path.isdir(directory):
+        return None
+    paths = sorted(
+        os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.json')
+    )
+    paths = [path for path in paths if path != exclude]
+    return paths[-1] if paths else None
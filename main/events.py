@@ -0,0 +1,188 @@
+"""
+Kitchen Event Feed
+Publish new orders and status changes to kitchen screens.
+
+The broker is chosen with the KITCHEN_EVENTS setting:
+
+    KITCHEN_EVENTS = {
+        'BACKEND': 'main.events.LocalBroker',   # single process
+        'OPTIONS': {},
+    }
+
+LocalBroker only reaches subscribers in the same process, which is enough
+for a single ASGI worker. Use RedisBroker when orders are created in other
+processes (several workers, or WSGI + ASGI side by side).
+
+The feed itself (views.kitchen_feed) is only served when
+KITCHEN_FEED_ENABLED is set, i.e. behind an ASGI server; events are still
+published to the in-process listeners either way.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = 'main.events.LocalBroker'
+HEARTBEAT_SECONDS = 15
+
+
+class LocalBroker:
+    """In-process pub/sub, publishers may run in any thread"""
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            loop, queue = subscriber
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                # The subscriber's event loop has closed
+                with self._lock:
+                    self._subscribers.discard(subscriber)
+
+    @staticmethod
+    def _deliver(queue, event):
+        if queue.full():
+            # Slow screen: drop the oldest event rather than block publishers
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    async def subscribe(self, heartbeat=HEARTBEAT_SECONDS):
+        """Yield events as they arrive, or None every heartbeat seconds"""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.max_queue))
+        with self._lock:
+            self._subscribers.add(subscriber)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber[1].get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+
+class RedisBroker:
+    """Cross-process pub/sub over a Redis channel (requires the redis package)"""
+
+    def __init__(self, url='redis://localhost:6379/0', channel='kitchen-events'):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured('RedisBroker requires the redis package (pip install redis)')
+        self.url = url
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, event):
+        self._client.publish(self.channel, json.dumps(event))
+
+    async def subscribe(self, heartbeat=HEARTBEAT_SECONDS):
+        """Yield events as they arrive, or None every heartbeat seconds"""
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=heartbeat)
+                yield json.loads(message['data']) if message else None
+        finally:
+            await pubsub.unsubscribe(self.channel)
+            await client.aclose()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Return the configured broker, created on first use"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = getattr(settings, 'KITCHEN_EVENTS', {})
+                backend = import_string(config.get('BACKEND', DEFAULT_BACKEND))
+                _broker = backend(**config.get('OPTIONS', {}))
+    return _broker
+
+
+def order_status_event(order_id, order_number, status, status_display):
+    """Build the payload for an order status change"""
+    return {
+        'type': 'order_status',
+        'id': order_id,
+        'order_number': order_number,
+        'status': status,
+        'status_display': status_display,
+    }
+
+
+def order_event(event_type, order, items=None):
+    """Build the JSON-serialisable payload for an order event"""
+    event = order_status_event(order.id, order.order_number, order.status, order.get_status_display())
+    event.update({
+        'type': event_type,
+        'order_type': order.order_type,
+        'created_at': order.created_at.isoformat() if order.created_at else None,
+    })
+    if items is not None:
+        event['items'] = [
+            {'menu_item_id': item.menu_item_id, 'name': item.menu_item.name, 'quantity': item.quantity}
+            for item in items
+        ]
+    return event
+
+
+# In-process callbacks run for every published event (e.g. the prep queue)
+_listeners = []
+
+
+def add_listener(callback):
+    """Call callback(event) in this process for every event published from it"""
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+def publish(event):
+    """Publish an event once the current transaction commits"""
+    def send():
+        for listener in _listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception('Kitchen event listener failed', extra={'event_type': event.get('type')})
+        try:
+            get_broker().publish(event)
+        except Exception:
+            # The feed is best effort, never fail the order because of it
+            logger.exception('Kitchen event publish failed', extra={'event_type': event.get('type')})
+
+    transaction.on_commit(send)
+
+
+_event_ids = itertools.count(1)
+
+
+def format_sse(event):
+    """Encode an event (or a heartbeat when event is None) as a Server-Sent Events frame"""
+    if event is None:
+        return ': keepalive\n\n'
+    return f"id: {next(_event_ids)}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,149 @@
+"""
+Streaming Data Exports
+Orders, order lines and reservations as CSV or JSON Lines.
+
+Rows are read with values_list().iterator(chunk_size=...) (server-side
+cursors where the database supports them) and encoded as they are read, so
+memory use stays flat no matter how many rows are exported. Order exports
+include the archive tables after the live ones.
+"""
+import csv
+import io
+import itertools
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, Reservation
+
+CHUNK_SIZE = 2000
+FLUSH_BYTES = 64 * 1024
+
+# kind -> (models, date field used for the range filter, status field, [(column, field)])
+EXPORTS = {
+    'orders': ((Order, ArchivedOrder), 'created_at__date', 'status', [
+        ('order_number', 'order_number'),
+        ('created_at', 'created_at'),
+        ('order_type', 'order_type'),
+        ('status', 'status'),
+        ('username', 'user__username'),
+        ('user_email', 'user__email'),
+        ('guest_name', 'guest_name'),
+        ('guest_email', 'guest_email'),
+        ('guest_phone', 'guest_phone'),
+        ('subtotal', 'subtotal'),
+        ('delivery_fee', 'delivery_fee'),
+        ('total', 'total'),
+        ('payment_method', 'payment_method'),
+    ]),
+    'order_items': ((OrderItem, ArchivedOrderItem), 'order__created_at__date', 'order__status', [
+        ('order_number', 'order__order_number'),
+        ('created_at', 'order__created_at'),
+        ('status', 'order__status'),
+        ('menu_item', 'menu_item__name'),
+        ('category', 'menu_item__category'),
+        ('quantity', 'quantity'),
+        ('price', 'price'),
+    ]),
+    'reservations': ((Reservation,), 'date', 'status', [
+        ('reservation_number', 'reservation_number'),
+        ('date', 'date'),
+        ('time', 'time'),
+        ('guests', 'guests'),
+        ('status', 'status'),
+        ('username', 'user__username'),
+        ('user_email', 'user__email'),
+        ('guest_name', 'guest_name'),
+        ('guest_email', 'guest_email'),
+        ('guest_phone', 'guest_phone'),
+        ('special_requests', 'special_requests'),
+        ('created_at', 'created_at'),
+    ]),
+}
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+
+def export_rows(kind, start=None, end=None, status=None):
+    """
+    Select the rows for an export
+
+    Returns:
+        tuple: (column names, iterator of row tuples)
+    """
+    if kind not in EXPORTS:
+        raise ValueError(f"Unknown export: {kind}")
+    models, date_field, status_field, columns = EXPORTS[kind]
+
+    filters = {}
+    if start:
+        filters[f'{date_field}__gte'] = start
+    if end:
+        filters[f'{date_field}__lte'] = end
+    if status:
+        filters[status_field] = status
+
+    header = [column for column, _ in columns]
+    fields = [field for _, field in columns]
+    return header, itertools.chain.from_iterable(
+        model.objects.filter(**filters).order_by('pk').values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+        for model in models
+    )
+
+
+def stream_csv(header, rows):
+    """Encode rows as CSV, yielding roughly FLUSH_BYTES at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_jsonl(header, rows):
+    """Encode rows as one JSON object per line, yielding roughly FLUSH_BYTES at a time"""
+    encoder = DjangoJSONEncoder()
+    lines = []
+    size = 0
+    for row in rows:
+        line = encoder.encode(dict(zip(header, row)))
+        lines.append(line)
+        size += len(line) + 1
+        if size >= FLUSH_BYTES:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+            size = 0
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def gzip_stream(chunks):
+    """Gzip a stream of text chunks on the fly"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(kind, fmt='csv', start=None, end=None, status=None, compress=False):
+    """
+    Stream an export in the given format
+
+    Returns:
+        iterator: str chunks, or bytes chunks when compress is True
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    header, rows = export_rows(kind, start, end, status)
+    chunks = stream_csv(header, rows) if fmt == 'csv' else stream_jsonl(header, rows)
+    return gzip_stream(chunks) if compress else chunks
@@ -0,0 +1,322 @@
+"""
+Synthetic Data
+Production-scale menus, customers, orders and reservations for local work.
+
+Everything comes from one seeded random.Random, so the same arguments give
+the same data. Rows are written with bulk_create in chunks, one transaction
+per chunk, with primary keys assigned up front so order lines never need
+to read their order back. Order times follow a weekday and lunch/dinner
+profile and dish popularity is long-tailed, so reports, rankings and the
+forecast have something realistic to chew on.
+"""
+import itertools
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .identifiers import RANDOM_BITS, identifier_at
+from .models import ArchivedOrder, ArchivedOrderItem, MenuItem, Order, OrderItem, Reservation
+
+DEFAULT_CHUNK_SIZE = 5000
+FAKE_PASSWORD = 'password'
+
+DISHES = {
+    'starter': ['Bruschetta', 'Calamari', 'Soup of the Day', 'Arancini', 'Burrata', 'Chicken Wings',
+                'Prawn Cocktail', 'Halloumi Fries', 'Scallops', 'Garlic Bread'],
+    'main': ['Ribeye Steak', 'Sea Bass', 'Lamb Shank', 'Mushroom Risotto', 'Chicken Supreme', 'Burger',
+             'Fish and Chips', 'Pork Belly', 'Lasagne', 'Salmon Fillet', 'Duck Breast', 'Vegetable Curry'],
+    'dessert': ['Tiramisu', 'Sticky Toffee Pudding', 'Cheesecake', 'Creme Brulee', 'Chocolate Fondant',
+                'Panna Cotta', 'Eton Mess', 'Affogato'],
+    'drink': ['Lemonade', 'Espresso', 'Cappuccino', 'Pinot Grigio', 'Malbec', 'Craft Lager', 'Mojito',
+              'Elderflower Spritz', 'Sparkling Water'],
+}
+STYLES = ['Classic', 'Smoked', 'Chargrilled', 'House', 'Truffle', 'Spiced', 'Seasonal', "Chef's", 'Rustic']
+PRICE_RANGES = {'starter': (450, 1100), 'main': (1200, 3200), 'dessert': (500, 950), 'drink': (250, 900)}
+FIRST_NAMES = ['Olivia', 'Amelia', 'Isla', 'Ava', 'Mia', 'Noah', 'Oliver', 'George', 'Leo', 'Arthur',
+               'Priya', 'Mohammed', 'Sofia', 'Luca', 'Chloe', 'Jack', 'Ella', 'Harry', 'Zara', 'Ethan']
+LAST_NAMES = ['Smith', 'Jones', 'Taylor', 'Brown', 'Williams', 'Wilson', 'Patel', 'Khan', 'Evans',
+              'Thomas', 'Roberts', 'Walker', 'Wright', 'Green', 'Hughes', 'Edwards', 'Lewis', 'Hall']
+
+# Relative order volume by weekday (Monday first) and by hour of day
+WEEKDAY_WEIGHTS = [0.8, 0.85, 0.9, 1.0, 1.4, 1.6, 1.2]
+HOUR_WEIGHTS = [0] * 11 + [2, 8, 9, 4, 2, 2, 5, 10, 12, 9, 5, 2, 0]
+RESERVATION_TIMES = [time(hour, minute) for hour in range(12, 22) for minute in (0, 15, 30, 45)]
+ACTIVE_STATUSES = ['paid', 'preparing', 'ready', 'out_for_delivery', 'delivered']
+
+
+@contextmanager
+def keep_timestamps(*models):
+    """Let bulk_create store the given created_at/updated_at instead of now"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+@contextmanager
+def relaxed_constraints():
+    """
+    Skip foreign key (and on MySQL unique) checks and durable commits while
+    bulk loading. Only safe for generated data whose keys are known valid.
+    """
+    statements = {
+        'postgresql': (
+            ['SET session_replication_role = replica', 'SET synchronous_commit = off'],
+            ['SET session_replication_role = DEFAULT', 'SET synchronous_commit = on'],
+        ),
+        'mysql': (
+            ['SET foreign_key_checks = 0', 'SET unique_checks = 0'],
+            ['SET foreign_key_checks = 1', 'SET unique_checks = 1'],
+        ),
+        'sqlite': (
+            ['PRAGMA foreign_keys = OFF', 'PRAGMA synchronous = OFF'],
+            ['PRAGMA foreign_keys = ON', 'PRAGMA synchronous = FULL'],
+        ),
+    }
+    relax, restore = statements.get(connection.vendor, ([], []))
+    with connection.cursor() as cursor:
+        for statement in relax:
+            cursor.execute(statement)
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for statement in restore:
+                cursor.execute(statement)
+
+
+def _chunks(rows, size):
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _next_id(*models):
+    """First primary key above every row of models (live and archive tables share ids)"""
+    return max(model.objects.aggregate(top=Max('pk'))['top'] or 0 for model in models) + 1
+
+
+def _reset_sequences(*models):
+    """Move id sequences past explicitly assigned keys (a no-op on MySQL and SQLite)"""
+    with connection.cursor() as cursor:
+        for statement in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(statement)
+
+
+class FakeDataGenerator:
+    """Seeded generator, call the methods in order: menu, users, orders, reservations"""
+
+    def __init__(self, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.progress = progress or (lambda message: None)
+        self.now = timezone.now()
+
+    def _bulk_create(self, model, rows, total):
+        created = 0
+        for chunk in _chunks(rows, self.chunk_size):
+            with transaction.atomic():
+                model.objects.bulk_create(chunk, batch_size=1000)
+            created += len(chunk)
+            self.progress(f'{model.__name__}: {created}/{total}')
+        return created
+
+    def menu(self, count):
+        """Menu items spread over the categories, returns the number created"""
+        categories = list(DISHES)
+        names = set(MenuItem.objects.values_list('name', flat=True))
+        items = []
+        for index in range(count):
+            category = categories[index % len(categories)]
+            dish = self.rng.choice(DISHES[category])
+            low, high = PRICE_RANGES[category]
+            name = base = f'{self.rng.choice(STYLES)} {dish}'
+            copy = 1
+            while name in names:  # Names are unique
+                copy += 1
+                name = f'{base} No. {copy}'
+            names.add(name)
+            items.append(MenuItem(
+                name=name,
+                description=f'Our {dish.lower()}, made fresh to order.',
+                category=category,
+                price=Decimal(self.rng.randrange(low, high, 5)) / 100,
+                ingredients='See allergen information',
+                allergens=self.rng.choice(['', 'Gluten', 'Dairy', 'Nuts', 'Gluten, Dairy', 'Fish']),
+                is_available=self.rng.random() > 0.05,
+            ))
+        return self._bulk_create(MenuItem, items, count)
+
+    def users(self, count):
+        """Customer accounts that all share FAKE_PASSWORD, returns the number created"""
+        password = make_password(FAKE_PASSWORD)  # Hashed once, hashing per user would take hours
+        start = _next_id(User)
+
+        def rows():
+            for index in range(start, start + count):
+                first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+                yield User(
+                    id=index,
+                    username=f'{first.lower()}.{last.lower()}{index}',
+                    email=f'{first.lower()}.{last.lower()}{index}@example.com',
+                    first_name=first,
+                    last_name=last,
+                    password=password,
+                    date_joined=self.now - timedelta(days=self.rng.randrange(1, 1000)),
+                )
+
+        created = self._bulk_create(User, rows(), count)
+        _reset_sequences(User)
+        return created
+
+    def _moments(self, count, days):
+        """
+        count order times over the last `days` days in chronological order,
+        following the weekly and daily profile, generated a day at a time
+        """
+        first_day = self.now.date() - timedelta(days=days - 1)
+        day_list = [first_day + timedelta(days=offset) for offset in range(days)]
+        weights = [WEEKDAY_WEIGHTS[day.weekday()] for day in day_list]
+        total = sum(weights)
+        per_day = [int(count * weight / total) for weight in weights]
+        for index in self.rng.choices(range(days), weights, k=count - sum(per_day)):
+            per_day[index] += 1
+
+        for day, orders in zip(day_list, per_day):
+            moments = []
+            for hour in self.rng.choices(range(24), HOUR_WEIGHTS, k=orders):
+                moment = timezone.make_aware(
+                    datetime.combine(day, time(hour, self.rng.randrange(60), self.rng.randrange(60)))
+                )
+                moments.append(min(moment, self.now - timedelta(minutes=self.rng.randrange(1, 180))))
+            yield from sorted(moments)
+
+    def orders(self, count, days=365, guest_share=0.25):
+        """
+        Orders with 1-5 lines each over the last `days` days, oldest first
+
+        Returns:
+            tuple: (orders created, order lines created)
+        """
+        catalog = list(MenuItem.objects.values_list('id', 'price'))
+        user_ids = list(User.objects.filter(is_staff=False).values_list('id', flat=True))
+        if not catalog:
+            raise ValueError('Generate a menu before orders')
+        # Long-tailed popularity: a few dishes sell far more than the rest
+        popularity = list(itertools.accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(catalog))))
+        self.rng.shuffle(catalog)
+
+        next_order = _next_id(Order, ArchivedOrder)
+        next_line = _next_id(OrderItem, ArchivedOrderItem)
+        orders_created = lines_created = 0
+
+        for chunk in _chunks(self._moments(count, days), self.chunk_size):
+            orders, lines = [], []
+            for created_at in chunk:
+                picks = set(self.rng.choices(catalog, cum_weights=popularity, k=self.rng.randint(1, 5)))
+                order_lines = [(menu_item_id, price, self.rng.choices((1, 2, 3), (6, 3, 1))[0]) for menu_item_id, price in picks]
+                subtotal = sum(price * quantity for _, price, quantity in order_lines)
+                order_type = 'delivery' if self.rng.random() < 0.55 else 'collection'
+                delivery_fee = Decimal('5.00') if order_type == 'delivery' else Decimal('0.00')
+                age = self.now - created_at
+                if age > timedelta(hours=3):
+                    status = 'cancelled' if self.rng.random() < 0.06 else 'completed'
+                else:
+                    status = self.rng.choice(ACTIVE_STATUSES)
+
+                guest = not user_ids or self.rng.random() < guest_share
+                first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+                orders.append(Order(
+                    id=next_order,
+                    user_id=None if guest else self.rng.choice(user_ids),
+                    order_number=identifier_at(created_at, self.rng.getrandbits(RANDOM_BITS)),
+                    order_type=order_type,
+                    status=status,
+                    guest_name=f'{first} {last}' if guest else '',
+                    guest_email=f'{first}.{last}{next_order}@example.com'.lower() if guest else '',
+                    guest_phone=f'07{self.rng.randrange(10 ** 9):09d}' if guest else '',
+                    delivery_address=f'{self.rng.randint(1, 200)} High Street' if order_type == 'delivery' else '',
+                    collection_time=created_at + timedelta(minutes=45) if order_type == 'collection' else None,
+                    subtotal=subtotal,
+                    delivery_fee=delivery_fee,
+                    total=subtotal + delivery_fee,
+                    created_at=created_at,
+                    updated_at=created_at + timedelta(minutes=self.rng.randint(20, 90)) if status != 'paid' else created_at,
+                ))
+                for menu_item_id, price, quantity in order_lines:
+                    lines.append(OrderItem(
+                        id=next_line, order_id=next_order, menu_item_id=menu_item_id, quantity=quantity, price=price,
+                    ))
+                    next_line += 1
+                next_order += 1
+
+            with transaction.atomic(), keep_timestamps(Order):
+                Order.objects.bulk_create(orders, batch_size=1000)
+                OrderItem.objects.bulk_create(lines, batch_size=1000)
+            orders_created += len(orders)
+            lines_created += len(lines)
+            self.progress(f'Order: {orders_created}/{count} ({lines_created} lines)')
+
+        _reset_sequences(Order, OrderItem)
+        return orders_created, lines_created
+
+    def reservations(self, count, days=365, future_days=60):
+        """
+        Reservations in free slots from `days` ago to `future_days` ahead,
+        returns the number created (fewer if the range runs out of slots)
+        """
+        user_ids = list(User.objects.filter(is_staff=False).values_list('id', flat=True))
+        today = self.now.date()
+        first_day = today - timedelta(days=days)
+        taken = set(
+            Reservation.objects.filter(date__gte=first_day).values_list('date', 'time')
+        )
+        slots = [
+            (first_day + timedelta(days=offset), slot)
+            for offset in range(days + future_days) for slot in RESERVATION_TIMES
+        ]
+        slots = [slot for slot in slots if slot not in taken]
+        slots = sorted(self.rng.sample(slots, min(count, len(slots))))
+
+        def rows():
+            for day, slot in slots:
+                if day < today:
+                    status = self.rng.choices(['completed', 'no_show', 'cancelled'], (85, 7, 8))[0]
+                else:
+                    status = self.rng.choices(['confirmed', 'pending', 'cancelled'], (80, 12, 8))[0]
+                created_at = timezone.make_aware(datetime.combine(day, slot)) - timedelta(days=self.rng.randint(1, 30))
+                guest = not user_ids or self.rng.random() < 0.4
+                first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+                yield Reservation(
+                    user_id=None if guest else self.rng.choice(user_ids),
+                    reservation_number=identifier_at(created_at, self.rng.getrandbits(RANDOM_BITS)),
+                    date=day,
+                    time=slot,
+                    guests=self.rng.choices(range(1, 9), (2, 10, 4, 6, 2, 2, 1, 1))[0],
+                    status=status,
+                    guest_name=f'{first} {last}' if guest else '',
+                    guest_email=f'{first}.{last}@example.com'.lower() if guest else '',
+                    guest_phone=f'07{self.rng.randrange(10 ** 9):09d}' if guest else '',
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+
+        with keep_timestamps(Reservation):
+            return self._bulk_create(Reservation, rows(), len(slots))
@@ -0,0 +1,139 @@
+"""
+Demand Forecast
+Per-dish, per-hour forecast used to plan kitchen prep.
+
+Sales history is loaded with one grouped query per table (quantity per
+menu item per hour, live and archived orders) into a NumPy array shaped
+(items, weeks, 7 days, 24 hours). Each
+day-of-week x hour cell is forecast as an exponentially weighted mean over
+the weeks, so recent weeks count most. Everything after the query is
+vectorised, so two years of history for a full menu takes milliseconds.
+NumPy is imported lazily; it is only needed by this module.
+"""
+import math
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import ArchivedOrderItem, MenuItem, OrderItem
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError('The demand forecast requires numpy (pip install numpy)')
+    return np
+
+
+def load_history(start, end):
+    """
+    Hourly quantity sold per menu item between start and end (dates, end exclusive),
+    from live and archived orders
+
+    Returns:
+        tuple: (menu item ids, array shaped (items, days, 24))
+    """
+    np = _numpy()
+    tz = timezone.get_current_timezone()
+    item_ids, hours, quantities = [], [], []
+    for model in (OrderItem, ArchivedOrderItem):
+        rows = (
+            model.objects
+            .exclude(order__status='cancelled')
+            .filter(
+                order__created_at__gte=timezone.make_aware(datetime.combine(start, time.min), tz),
+                order__created_at__lt=timezone.make_aware(datetime.combine(end, time.min), tz),
+            )
+            .annotate(hour=TruncHour('order__created_at', tzinfo=tz))
+            .values_list('menu_item_id', 'hour')
+            .annotate(quantity=Sum('quantity'))
+            .order_by()
+        )
+        for menu_item_id, hour, quantity in rows:
+            item_ids.append(menu_item_id)
+            hours.append(timezone.localtime(hour, tz).replace(tzinfo=None))
+            quantities.append(quantity)
+
+    days = (end - start).days
+    if not item_ids:
+        return [], np.zeros((0, days, 24))
+
+    ids, item_index = np.unique(np.array(item_ids), return_inverse=True)
+    offsets = (np.array(hours, dtype='datetime64[h]') - np.datetime64(start, 'h')).astype(np.int64)
+    history = np.zeros((len(ids), days * 24))
+    np.add.at(history, (item_index, offsets), quantities)
+    return ids.tolist(), history.reshape(len(ids), days, 24)
+
+
+def forecast_profile(history, start, alpha=0.3):
+    """
+    Exponentially smoothed day-of-week x hour profile
+
+    Args:
+        history: array shaped (items, days, 24) starting on date start
+        alpha: Smoothing factor, higher values follow recent weeks more closely
+
+    Returns:
+        array shaped (items, 7, 24), indexed by weekday (Monday = 0)
+    """
+    np = _numpy()
+    items, days, _ = history.shape
+    weeks = days // 7
+    if weeks == 0:
+        return np.zeros((items, 7, 24))
+
+    # Keep the most recent whole weeks and index the days by weekday
+    recent = history[:, days - weeks * 7:, :].reshape(items, weeks, 7, 24)
+    first_weekday = (start + timedelta(days=days - weeks * 7)).weekday()
+    recent = np.roll(recent, first_weekday, axis=2)
+
+    weights = (1 - alpha) ** np.arange(weeks - 1, -1, -1)
+    return np.tensordot(weights / weights.sum(), recent, axes=([0], [1]))
+
+
+def prep_sheet(day=None, weeks=None, alpha=None, margin=None):
+    """
+    Forecast how much of each dish to prepare on day (default: tomorrow)
+
+    Returns:
+        list: dicts with menu_item, forecast, prep (rounded up with margin),
+              peak_hour and hourly (24 floats), busiest dish first
+    """
+    np = _numpy()
+    day = day or timezone.localdate() + timedelta(days=1)
+    weeks = weeks or getattr(settings, 'FORECAST_HISTORY_WEEKS', 104)
+    alpha = alpha if alpha is not None else getattr(settings, 'FORECAST_SMOOTHING', 0.3)
+    margin = margin if margin is not None else getattr(settings, 'FORECAST_SAFETY_MARGIN', 0.1)
+
+    end = min(day, timezone.localdate() + timedelta(days=1))
+    start = end - timedelta(weeks=weeks)
+    item_ids, history = load_history(start, end)
+    if not item_ids:
+        return []
+
+    # Weeks before the first sale would drag every forecast towards zero
+    first_day = int(np.flatnonzero(history.sum(axis=(0, 2)))[0])
+    history = history[:, first_day:, :]
+    start += timedelta(days=first_day)
+
+    hourly = forecast_profile(history, start, alpha)[:, day.weekday(), :]
+    totals = hourly.sum(axis=1)
+    menu_items = MenuItem.objects.in_bulk(item_ids)
+
+    sheet = []
+    for index in np.argsort(-totals):
+        menu_item = menu_items.get(item_ids[index])
+        if menu_item is None or not menu_item.is_available or totals[index] <= 0:
+            continue
+        sheet.append({
+            'menu_item': menu_item,
+            'forecast': round(float(totals[index]), 1),
+            'prep': math.ceil(totals[index] * (1 + margin)),
+            'peak_hour': int(hourly[index].argmax()),
+            'hourly': [round(float(value), 1) for value in hourly[index]],
+        })
+    return sheet
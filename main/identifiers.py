@@ -0,0 +1,66 @@
+"""
+Order and Reservation Numbers
+Short, time-ordered, URL-safe identifiers.
+
+Each identifier is 16 Crockford base32 characters (as long as the old
+truncated UUIDs): a 48-bit millisecond timestamp followed by 32 random
+bits. New numbers sort after older ones, so inserts land at the end of the
+unique index and numbers correlate with recency. Within one millisecond
+the random part is incremented instead of redrawn, which keeps numbers
+from one process strictly increasing and unique. Two processes can still
+draw the same number in the same millisecond, so Order and Reservation
+retry with a new number when the insert hits the unique constraint.
+"""
+import os
+import threading
+import time
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'  # Crockford base32, no I/L/O/U
+TIMESTAMP_BITS = 48
+RANDOM_BITS = 32
+LENGTH = (TIMESTAMP_BITS + RANDOM_BITS) // 5
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+
+def _encode(value, length):
+    chars = []
+    for _ in range(length):
+        value, index = divmod(value, 32)
+        chars.append(ALPHABET[index])
+    return ''.join(reversed(chars))
+
+
+def _random_part():
+    # Leave the top bit clear so increments within a millisecond can't overflow
+    return int.from_bytes(os.urandom(RANDOM_BITS // 8), 'big') >> 1
+
+
+def _identifier(ms, random_part):
+    return _encode(ms << RANDOM_BITS | random_part, LENGTH)
+
+
+def new_identifier():
+    """A new monotonic identifier, e.g. '01J9ZQ4T6K8X2M5R'"""
+    global _last_ms, _last_random
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms <= _last_ms:
+            # Same (or an earlier, if the clock stepped back) millisecond:
+            # stay on the last timestamp and count up from the last number
+            now_ms = _last_ms
+            random_part = _last_random + 1
+            if random_part >> RANDOM_BITS:
+                now_ms += 1
+                random_part = _random_part()
+        else:
+            random_part = _random_part()
+        _last_ms, _last_random = now_ms, random_part
+    return _identifier(now_ms, random_part)
+
+
+def identifier_at(moment, random_part):
+    """The identifier for an aware datetime and a 32-bit random part (for generated history)"""
+    return _identifier(int(moment.timestamp() * 1000), random_part)
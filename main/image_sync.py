@@ -0,0 +1,142 @@
+"""
+Menu Image Sync
+Attach a directory of images to menu items in one pass.
+
+Files are matched to items by normalized name: accents, case, punctuation
+and spacing are ignored, so 'classic creme brulee.jpg' matches 'Classic
+Crème Brûlée'. When there is no exact match, the words may also be in a
+different order or the shorter name may be contained in the longer one
+('cucumber mint refresher.jpg' -> 'CUCUMBER MINT'), as long as exactly one
+item matches.
+
+An item is unchanged when its current image has the same SHA-256 as the
+file. Files outside MEDIA_ROOT are copied into the media storage under a
+name that includes the hash; files inside it are used in place. All
+changed items are written with one bulk_update.
+"""
+import hashlib
+import os
+import re
+import unicodedata
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.text import slugify
+
+from .menu_sync import invalidate_menu_caches
+from .models import MenuItem
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.jfif', '.png', '.webp', '.gif', '.avif'}
+UPLOAD_DIRECTORY = 'menu_items'
+_HASH_SUFFIX = re.compile(r'-[0-9a-f]{12}$')  # Added to the names of copied files
+
+
+def normalize_name(text):
+    """Words of text, lower case without accents or punctuation"""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    return tuple(''.join(char if char.isalnum() else ' ' for char in text).split())
+
+
+def file_hash(f):
+    """SHA-256 hex digest of an open binary file"""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan(directory):
+    """Image files in directory (not recursive), sorted"""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+        and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def match_files(paths, items):
+    """
+    Pair files with menu items by normalized name
+
+    Returns:
+        tuple: ({item: path}, [unmatched paths], {path: [item names]} for files matching
+        several items or an item another file already matched
+    """
+    exact, reordered = {}, {}
+    for item in items:
+        words = normalize_name(item.name)
+        exact.setdefault(words, []).append(item)
+        reordered.setdefault(tuple(sorted(words)), []).append(item)
+
+    matched, unmatched, ambiguous = {}, [], {}
+    for path in paths:
+        words = normalize_name(_HASH_SUFFIX.sub('', os.path.splitext(os.path.basename(path))[0]))
+        candidates = exact.get(words) or reordered.get(tuple(sorted(words)))
+        if not candidates and words:
+            candidates = [
+                item for item in items
+                if set(words) <= set(normalize_name(item.name)) or set(normalize_name(item.name)) <= set(words)
+            ]
+        if not candidates:
+            unmatched.append(path)
+        elif len(candidates) > 1:
+            ambiguous[path] = sorted(item.name for item in candidates)
+        elif candidates[0] in matched:
+            ambiguous[path] = [candidates[0].name]
+        else:
+            matched[candidates[0]] = path
+    return matched, unmatched, ambiguous
+
+
+def _current_hash(item):
+    if not item.image or not default_storage.exists(item.image.name):
+        return None
+    with default_storage.open(item.image.name, 'rb') as f:
+        return file_hash(f)
+
+
+def _storage_name(item, path, digest, copy=True):
+    """Name of path in the media storage, copying it there (if copy) when it lives elsewhere"""
+    media_root = os.path.realpath(settings.MEDIA_ROOT)
+    real_path = os.path.realpath(path)
+    if os.path.commonpath([media_root, real_path]) == media_root:
+        return os.path.relpath(real_path, media_root).replace(os.sep, '/')
+    extension = os.path.splitext(path)[1].lower()
+    name = f'{UPLOAD_DIRECTORY}/{slugify(item.name) or "item"}-{digest[:12]}{extension}'
+    if copy and not default_storage.exists(name):
+        with open(path, 'rb') as f:
+            name = default_storage.save(name, File(f))
+    return name
+
+
+def sync_images(directory, dry_run=False):
+    """
+    Attach the images in directory to the matching menu items
+
+    Returns:
+        dict: 'updated' [(item name, storage name)], 'unchanged' count, 'unmatched' paths, 'ambiguous' {path: names}
+    """
+    items = list(MenuItem.objects.only('id', 'name', 'image'))
+    matched, unmatched, ambiguous = match_files(scan(directory), items)
+    result = {'updated': [], 'unchanged': 0, 'unmatched': unmatched, 'ambiguous': ambiguous}
+
+    changed = []
+    for item, path in sorted(matched.items(), key=lambda pair: pair[0].name):
+        with open(path, 'rb') as f:
+            digest = file_hash(f)
+        if digest == _current_hash(item):
+            result['unchanged'] += 1
+            continue
+        name = _storage_name(item, path, digest, copy=not dry_run)
+        item.image = name
+        changed.append(item)
+        result['updated'].append((item.name, name))
+
+    if changed and not dry_run:
+        with transaction.atomic():
+            MenuItem.objects.bulk_update(changed, ['image'], batch_size=500)
+            transaction.on_commit(invalidate_menu_caches)
+    return result
@@ -0,0 +1,101 @@
+"""
+Structured Logging
+JSON log lines written by a background thread, tagged with the request id.
+
+Request threads never write to the log stream themselves: BackgroundHandler
+formats a record and puts it on a bounded in-memory queue, and a
+QueueListener thread does the I/O. When the queue is full (the stream is
+stuck) records are dropped and counted in log_records_dropped_total rather
+than blocking the request.
+
+RequestIdMiddleware (main/middleware.py) sets the id for each request,
+from the X-Request-ID header of a trusted proxy or a new identifier, and
+RequestIdFilter copies it onto every record logged while the request runs.
+Configured in settings.LOGGING.
+"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from datetime import datetime, timezone
+
+from . import metrics
+
+request_id = contextvars.ContextVar('request_id', default=None)
+
+# Attributes of every LogRecord, anything else came in through extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class RequestIdFilter(logging.Filter):
+    """Add the current request id (or None outside a request) to records"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            # django.request logs the response after the middleware has returned
+            record.request_id = request_id.get() or getattr(getattr(record, 'request', None), 'request_id', None)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record with the extra fields as keys"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+        }
+        for key, value in vars(record).items():
+            if key in _RECORD_ATTRIBUTES or key in data or key.startswith('_'):
+                continue
+            if key == 'request':
+                # Django's request loggers pass the HttpRequest
+                value = f'{value.method} {value.get_full_path()}'
+            data[key] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(data, default=str)
+
+
+class BackgroundHandler(logging.handlers.QueueHandler):
+    """
+    Format records in the calling thread and write them to stream
+    (default stderr) from a listener thread
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        self.stream = stream
+        self.maxsize = maxsize
+        super().__init__(queue.Queue(maxsize))
+        self._start_listener()
+        if hasattr(os, 'register_at_fork'):
+            # Threads don't survive fork (gunicorn --preload), start a new listener in the worker
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start_listener(self):
+        target = logging.StreamHandler(self.stream)
+        self.listener = logging.handlers.QueueListener(self.queue, target)
+        self.listener.start()
+
+    def _after_fork(self):
+        self.queue = queue.Queue(self.maxsize)
+        self._start_listener()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.inc('log_records_dropped_total')
+
+    def close(self):
+        # Write out what is queued before the process exits
+        if self.listener._thread is not None:
+            self.listener.stop()
+        super().close()
@@ -0,0 +1,127 @@
+"""
+Scheduled Maintenance Jobs
+Registered housekeeping jobs that move stale rows out of the "active" sets.
+
+Every job works in bounded chunks of primary keys so a single UPDATE/DELETE
+never touches more than chunk_size rows, keeping locks short during service.
+Run them from cron with ``python manage.py run_maintenance`` or in-process
+with ``MaintenanceTimer``.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import Order
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+# name -> callable(chunk_size, pause) returning the number of rows changed
+JOBS = {}
+
+
+def maintenance_job(name):
+    """Register a function as a maintenance job under name"""
+    def decorator(func):
+        JOBS[name] = func
+        return func
+    return decorator
+
+
+def update_in_chunks(queryset, chunk_size, pause=0, **changes):
+    """Apply .update(**changes) to queryset chunk_size rows at a time"""
+    model = queryset.model
+    total = 0
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            break
+        total += model.objects.filter(pk__in=ids).update(**changes)
+        if len(ids) < chunk_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return total
+
+
+def delete_in_chunks(queryset, chunk_size, pause=0):
+    """Delete the rows of queryset chunk_size rows at a time"""
+    model = queryset.model
+    total = 0
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            break
+        deleted, _ = model.objects.filter(pk__in=ids).delete()
+        total += deleted
+        if len(ids) < chunk_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return total
+
+
+@maintenance_job('complete_delivered_orders')
+def complete_delivered_orders(chunk_size=DEFAULT_CHUNK_SIZE, pause=0):
+    """Mark orders delivered more than MAINTENANCE_DELIVERED_ORDER_HOURS ago as completed"""
+    hours = getattr(settings, 'MAINTENANCE_DELIVERED_ORDER_HOURS', 6)
+    stale = Order.objects.filter(
+        status='delivered',
+        updated_at__lt=timezone.now() - timedelta(hours=hours),
+    ).order_by()
+    return update_in_chunks(stale, chunk_size, pause, status='completed', updated_at=timezone.now())
+
+
+@maintenance_job('purge_expired_sessions')
+def purge_expired_sessions(chunk_size=DEFAULT_CHUNK_SIZE, pause=0):
+    """Delete database sessions that have expired"""
+    expired = Session.objects.filter(expire_date__lt=timezone.now()).order_by()
+    return delete_in_chunks(expired, chunk_size, pause)
+
+
+def run_jobs(names=None, chunk_size=DEFAULT_CHUNK_SIZE, pause=0):
+    """
+    Run the named maintenance jobs (all of them by default)
+
+    Returns:
+        dict: job name -> number of rows changed
+    """
+    names = names or list(JOBS)
+    unknown = [name for name in names if name not in JOBS]
+    if unknown:
+        raise ValueError(f"Unknown maintenance job(s): {', '.join(unknown)}")
+    return {name: JOBS[name](chunk_size=chunk_size, pause=pause) for name in names}
+
+
+class MaintenanceTimer(threading.Thread):
+    """Background thread that runs the maintenance jobs every interval seconds"""
+
+    def __init__(self, interval, names=None, chunk_size=DEFAULT_CHUNK_SIZE, pause=0):
+        super().__init__(name='maintenance-timer', daemon=True)
+        self.interval = interval
+        self.names = names
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.last_results = {}
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                self.last_results = run_jobs(self.names, self.chunk_size, self.pause)
+            except Exception:
+                # Keep the timer alive, the next run will retry
+                logger.exception('Maintenance jobs failed')
+            finally:
+                close_old_connections()
+            self._stopped.wait(self.interval)
+
+    def stop(self):
+        self._stopped.set()
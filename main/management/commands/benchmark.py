@@ -0,0 +1,72 @@
+"""
+Load test the ordering funnel against a running server and save the results
+Example: python manage.py benchmark --seed --url http://127.0.0.1:8000 --users 20 --duration 60
+
+The server must use the same database as this command (for --seed and the
+benchmark staff account). Run it with several workers, e.g.
+gunicorn restaurant_core.wsgi -w 4, to measure something close to production.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Drive concurrent ordering, reservation and admin journeys and report latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the running server')
+        parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users')
+        parser.add_argument('--duration', type=int, default=30, help='Seconds to run')
+        parser.add_argument('--seed', action='store_true', help='Seed a catalog and order history first')
+        parser.add_argument('--menu-items', type=int, default=40)
+        parser.add_argument('--customers', type=int, default=200)
+        parser.add_argument('--orders', type=int, default=2000, help='Historic orders to seed')
+        parser.add_argument('--random-seed', type=int, default=0, help='Seed for seeding and journey choices')
+        parser.add_argument('--output', default='benchmarks', help='Directory results are saved in')
+        parser.add_argument('--compare', help='Saved results to compare with (default: the previous run)')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['duration'] < 1:
+            raise CommandError('--users and --duration must be at least 1')
+
+        if options['seed']:
+            created = benchmark.seed(
+                options['menu_items'], options['customers'], options['orders'], seed_value=options['random_seed'],
+            )
+            self.stdout.write('Seeded ' + ', '.join(f'{count} {kind}' for kind, count in created.items()))
+
+        self.stdout.write(f"Running {options['users']} users for {options['duration']}s against {options['url']}")
+        try:
+            summary = benchmark.run(options['url'], options['users'], options['duration'], options['random_seed'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        path = benchmark.save_results(summary, options['output'])
+
+        previous = None
+        compare = options['compare'] or benchmark.latest_results(options['output'], exclude=path)
+        if compare:
+            with open(compare) as f:
+                previous = json.load(f)
+
+        self.stdout.write(f"\n{'step':<20}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for step, stats in summary['steps'].items():
+            line = (
+                f"{step:<20}{stats['requests']:>9}{stats['errors']:>8}"
+                f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}"
+            )
+            before = previous and previous['steps'].get(step)
+            if before:
+                line += f"   p95 {stats['p95_ms'] - before['p95_ms']:+.1f} ms vs {previous['commit']}"
+            self.stdout.write(line)
+
+        self.stdout.write(f"\n{summary['requests']} requests, {summary['throughput']} requests/s")
+        if summary['queries_per_request']:
+            self.stdout.write('Queries per request: ' + ', '.join(
+                f'{view} {count}' for view, count in sorted(summary['queries_per_request'].items())
+            ))
+        else:
+            self.stdout.write('Queries per request unavailable (could not read /metrics)')
+        self.stdout.write(self.style.SUCCESS(f'Saved {path}'))
@@ -0,0 +1,32 @@
+"""
+Time rendering menu cards for growing item counts, rendered vs cached
+Example: python manage.py benchmark_menu_render --counts 10 100 500 --repeat 50
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from main import benchmark, menu_cards
+
+TEMPLATES = {'menu': menu_cards.MENU_CARD, 'home': menu_cards.HOME_CARD}
+
+
+class Command(BaseCommand):
+    help = 'Report the time to produce menu cards with every card rendered and with every card cached'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--counts', type=int, nargs='+', default=[10, 50, 100, 200], help='Item counts')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per count, the median is reported')
+        parser.add_argument('--card', choices=list(TEMPLATES), default='menu', help='Card template')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1 or min(options['counts']) < 1:
+            raise CommandError('--counts and --repeat must be at least 1')
+
+        rows = benchmark.render_menu_cards(options['counts'], options['repeat'], TEMPLATES[options['card']])
+        self.stdout.write(f"{'items':>7}{'rendered ms':>13}{'cached ms':>11}{'us/item':>10}{'us/item':>10}{'speedup':>9}")
+        self.stdout.write(f"{'':>7}{'':>13}{'':>11}{'rendered':>10}{'cached':>10}")
+        for row in rows:
+            speedup = row['cold_ms'] / row['warm_ms'] if row['warm_ms'] else 0
+            self.stdout.write(
+                f"{row['count']:>7}{row['cold_ms']:>13}{row['warm_ms']:>11}"
+                f"{row['cold_us_per_item']:>10}{row['warm_us_per_item']:>10}{speedup:>8.1f}x"
+            )
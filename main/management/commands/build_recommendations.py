@@ -0,0 +1,28 @@
+"""
+Rebuild the "pairs well with" recommendations from order history
+Requires numpy and scipy. Example: python manage.py build_recommendations --top-k 10 --days 365
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.recommendations import DEFAULT_TOP_K, build_pairings
+
+
+class Command(BaseCommand):
+    help = 'Compute item co-occurrence from orders and store the top K pairings per menu item'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K, help='Neighbours kept per item')
+        parser.add_argument('--days', type=int, default=365, help='Days of order history to use')
+
+    def handle(self, *args, **options):
+        if options['top_k'] < 1:
+            raise CommandError('--top-k must be at least 1')
+
+        started = time.perf_counter()
+        try:
+            count = build_pairings(options['top_k'], options['days'])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        self.stdout.write(f"Stored {count} pairing(s) in {time.perf_counter() - started:.2f}s")
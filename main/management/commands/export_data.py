@@ -0,0 +1,49 @@
+"""
+Stream orders, order lines or reservations to a file or stdout
+Example: python manage.py export_data order_items --start 2026-01-01 --gzip -o lines.csv.gz
+"""
+import sys
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.exports import EXPORTS, FORMATS, stream_export
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = 'Export orders, order lines or reservations as CSV or JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(EXPORTS))
+        parser.add_argument('--format', choices=list(FORMATS), default='csv')
+        parser.add_argument('--start', help='First day to include (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day to include (YYYY-MM-DD)')
+        parser.add_argument('--status', help='Only rows with this status')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+
+    def handle(self, *args, **options):
+        start = parse_date(options['start']) if options['start'] else None
+        end = parse_date(options['end']) if options['end'] else None
+        chunks = stream_export(
+            options['kind'], options['format'], start, end, options['status'], options['gzip'],
+        )
+
+        if options['output']:
+            mode = 'wb' if options['gzip'] else 'w'
+            encoding = None if options['gzip'] else 'utf-8'
+            with open(options['output'], mode, encoding=encoding, newline='' if encoding else None) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        else:
+            out = sys.stdout.buffer if options['gzip'] else sys.stdout
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
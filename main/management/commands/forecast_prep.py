@@ -0,0 +1,42 @@
+"""
+Print the kitchen prep sheet for a day (default: tomorrow)
+Requires numpy. Example: python manage.py forecast_prep --date 2026-02-14
+"""
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.forecasting import prep_sheet
+
+
+class Command(BaseCommand):
+    help = 'Forecast how much of each dish to prepare'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Day to forecast (YYYY-MM-DD, default: tomorrow)')
+        parser.add_argument('--weeks', type=int, help='Weeks of history to use')
+        parser.add_argument('--alpha', type=float, help='Smoothing factor (0-1)')
+        parser.add_argument('--margin', type=float, help='Safety margin, e.g. 0.1 for 10%%')
+
+    def handle(self, *args, **options):
+        day = None
+        if options['date']:
+            try:
+                day = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError(f"Invalid date '{options['date']}', expected YYYY-MM-DD")
+
+        started = time.perf_counter()
+        try:
+            sheet = prep_sheet(day, options['weeks'], options['alpha'], options['margin'])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"{'Dish':30} {'Forecast':>9} {'Prep':>6} {'Peak':>6}")
+        for row in sheet:
+            self.stdout.write(
+                f"{row['menu_item'].name:30} {row['forecast']:>9} {row['prep']:>6} {row['peak_hour']:>4}:00"
+            )
+        self.stdout.write(f"\n{len(sheet)} dish(es) forecast in {elapsed:.3f}s")
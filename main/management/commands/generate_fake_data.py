@@ -0,0 +1,73 @@
+"""
+Generate production-scale synthetic data (menu, customers, orders, reservations)
+Example: python manage.py generate_fake_data --users 50000 --orders 2000000 --reservations 100000 --fast
+
+The same --seed gives the same data. Generated customers log in with the
+password 'password'. Sales rollups are not updated incrementally for
+generated orders, pass --rebuild-rollups (or run rebuild_sales_rollups) for
+reports and rankings.
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.fake_data import DEFAULT_CHUNK_SIZE, FakeDataGenerator, relaxed_constraints
+from main.reporting import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Bulk insert seeded synthetic menu items, customers, orders and reservations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--menu-items', type=int, default=60)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--orders', type=int, default=100000)
+        parser.add_argument('--reservations', type=int, default=5000)
+        parser.add_argument('--days', type=int, default=365, help='Days of history to spread rows over')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows per transaction')
+        parser.add_argument(
+            '--fast', action='store_true',
+            help='Disable foreign key checks and durable commits while loading (local databases only)',
+        )
+        parser.add_argument('--rebuild-rollups', action='store_true', help='Rebuild sales rollups afterwards')
+
+    def handle(self, *args, **options):
+        for option in ('menu_items', 'users', 'orders', 'reservations'):
+            if options[option] < 0:
+                raise CommandError(f"--{option.replace('_', '-')} cannot be negative")
+        if options['days'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--days and --chunk-size must be at least 1')
+
+        verbose = options['verbosity'] > 1
+        generator = FakeDataGenerator(
+            options['seed'], options['chunk_size'], progress=self.stdout.write if verbose else None,
+        )
+        started = time.monotonic()
+
+        if options['fast']:
+            with relaxed_constraints():
+                created = self._generate(generator, options)
+        else:
+            created = self._generate(generator, options)
+
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(f'{count} {kind}' for kind, count in created.items())
+            + f' in {time.monotonic() - started:.1f}s'
+        ))
+
+        if options['rebuild_rollups'] and created['orders']:
+            today = generator.now.date()
+            days, items = rebuild_rollups(today - timedelta(days=options['days']), today)
+            self.stdout.write(f'Rebuilt {days} daily and {items} daily item rollups')
+
+    def _generate(self, generator, options):
+        try:
+            created = {'menu items': generator.menu(options['menu_items'])}
+            created['users'] = generator.users(options['users'])
+            created['orders'], created['order lines'] = generator.orders(options['orders'], options['days'])
+            created['reservations'] = generator.reservations(options['reservations'], options['days'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        return created
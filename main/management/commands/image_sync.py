@@ -0,0 +1,38 @@
+"""
+Attach menu item images from a directory, matched by item name
+Example: python manage.py image_sync media/menu_items --dry-run
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.image_sync import sync_images
+
+
+class Command(BaseCommand):
+    help = 'Match image files to menu items by name and update the changed images in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Directory of images named after menu items')
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without applying them')
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(options['directory']):
+            raise CommandError(f"'{options['directory']}' is not a directory")
+
+        result = sync_images(options['directory'], options['dry_run'])
+        for name, image in result['updated']:
+            self.stdout.write(f'  ~ {name} -> {image}')
+        for path, names in result['ambiguous'].items():
+            self.stdout.write(self.style.WARNING(f"  ? {os.path.basename(path)} matches {', '.join(names)} (several items or files)"))
+        for path in result['unmatched']:
+            self.stdout.write(self.style.WARNING(f'  ? {os.path.basename(path)} matches no menu item'))
+
+        summary = (
+            f"{len(result['updated'])} updated, {result['unchanged']} unchanged, "
+            f"{len(result['unmatched']) + len(result['ambiguous'])} not matched"
+        )
+        if options['dry_run']:
+            self.stdout.write(f'Dry run, nothing applied: {summary}')
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
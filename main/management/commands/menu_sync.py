@@ -0,0 +1,51 @@
+"""
+Apply a menu file (JSON, CSV or YAML) to the menu, or export the menu
+Example: python manage.py menu_sync menu/additions.json --dry-run
+         python manage.py menu_sync menu.csv --export
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from main.menu_sync import clean_rows, export_menu, menu_format, read_menu, sync_menu
+
+
+class Command(BaseCommand):
+    help = 'Add and update menu items from a file in one transaction, matched by name'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Menu file (.json, .csv, .yaml or .yml)')
+        parser.add_argument('--export', action='store_true', help='Write the current menu to path instead')
+        parser.add_argument(
+            '--remove-missing', action='store_true', help='Mark items that are not in the file unavailable',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without applying them')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            file_format = menu_format(path)
+            if options['export']:
+                text = export_menu(file_format)
+                with open(path, 'w', encoding='utf-8', newline='') as f:
+                    f.write(text)
+                self.stdout.write(self.style.SUCCESS(f'Exported the menu to {path}'))
+                return
+            rows = clean_rows(read_menu(path))
+        except (OSError, ValueError, RuntimeError) as e:
+            raise CommandError(str(e))
+
+        plan = sync_menu(rows, options['remove_missing'], options['dry_run'])
+        for row in plan['added']:
+            self.stdout.write(f"  + {row['name']}")
+        for row in plan['changed']:
+            self.stdout.write(f"  ~ {row['name']} ({', '.join(plan['changes'][row['name']])})")
+        for name in plan['removed']:
+            self.stdout.write(f'  - {name} (now unavailable)')
+
+        summary = (
+            f"{len(plan['added'])} added, {len(plan['changed'])} changed, "
+            f"{len(plan['removed'])} removed, {plan['unchanged']} unchanged"
+        )
+        if options['dry_run']:
+            self.stdout.write(f'Dry run, nothing applied: {summary}')
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,58 @@
+"""
+Measure the cold start of the WSGI application in a fresh interpreter
+Example: python manage.py profile_startup --runs 5 --check
+"""
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main.startup import import_time_by_package, measure_cold_start
+
+
+class Command(BaseCommand):
+    help = 'Report boot time, first request latency and import time per module'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/', help='Path of the first request')
+        parser.add_argument('--host', default='localhost', help='Host header (must be in ALLOWED_HOSTS)')
+        parser.add_argument('--runs', type=int, default=3, help='Cold starts to measure, the median is reported')
+        parser.add_argument('--top', type=int, default=15, help='Modules and packages to list')
+        parser.add_argument('--warmup', action='store_true', help='Measure with WARMUP_ON_BOOT on')
+        parser.add_argument('--check', action='store_true', help='Fail when over STARTUP_TARGET_SECONDS')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be at least 1')
+        warm_up = True if options['warmup'] else None
+        try:
+            runs = [measure_cold_start(options['path'], options['host'], warm_up) for _ in range(options['runs'])]
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        run = sorted(runs, key=lambda run: run['boot'] + run['first_request'])[len(runs) // 2]
+
+        boot = statistics.median(run['boot'] for run in runs)
+        first = statistics.median(run['first_request'] for run in runs)
+        second = statistics.median(run['second_request'] for run in runs)
+        self.stdout.write(f"Median of {len(runs)} cold starts, GET {options['path']} -> {run['status']}")
+        self.stdout.write(f'  boot            {boot * 1000:8.1f} ms')
+        self.stdout.write(f'  first request   {first * 1000:8.1f} ms')
+        self.stdout.write(f'  second request  {second * 1000:8.1f} ms')
+
+        self.stdout.write('\nImport time by package (self):')
+        for package, seconds in import_time_by_package(run['modules'])[:options['top']]:
+            self.stdout.write(f'  {seconds * 1000:8.1f} ms  {package}')
+        self.stdout.write('\nSlowest modules (self):')
+        for name, self_us, cumulative_us, _ in sorted(run['modules'], key=lambda m: m[1], reverse=True)[:options['top']]:
+            self.stdout.write(f'  {self_us / 1000:8.1f} ms  {name} ({cumulative_us / 1000:.1f} ms with imports)')
+
+        target = getattr(settings, 'STARTUP_TARGET_SECONDS', None)
+        if target:
+            total = boot + first
+            line = f'\nBoot + first request {total * 1000:.0f} ms, target {target * 1000:.0f} ms'
+            if total > target:
+                if options['check']:
+                    raise CommandError(line.strip() + ': over target')
+                self.stdout.write(self.style.WARNING(line))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
@@ -0,0 +1,37 @@
+"""
+Rebuild the daily sales rollups from live and archived orders
+Example: python manage.py rebuild_sales_rollups --start 2026-01-01 --end 2026-01-31
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from main.reporting import first_order_date, rebuild_rollups
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily sales rollups for a date range (default: all history)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD, default: today)')
+
+    def handle(self, *args, **options):
+        end = parse_date(options['end']) if options['end'] else timezone.localdate()
+        if options['start']:
+            start = parse_date(options['start'])
+        else:
+            start = first_order_date() or end
+        if start > end:
+            raise CommandError('--start must not be after --end')
+
+        daily, daily_items = rebuild_rollups(start, end)
+        self.stdout.write(f"Rebuilt {start} to {end}: {daily} daily row(s), {daily_items} item row(s)")
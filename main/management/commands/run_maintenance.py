@@ -0,0 +1,36 @@
+"""
+Run the registered maintenance jobs
+Cron example: */15 * * * * python manage.py run_maintenance
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.maintenance import DEFAULT_CHUNK_SIZE, JOBS, run_jobs
+
+
+class Command(BaseCommand):
+    help = 'Auto-complete stale orders/reservations and purge expired sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('jobs', nargs='*', help=f"Jobs to run (default: all). Available: {', '.join(JOBS)}")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows per UPDATE/DELETE')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between chunks')
+        parser.add_argument('--every', type=int, default=0, help='Keep running, repeating every N seconds')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        while True:
+            try:
+                results = run_jobs(options['jobs'], options['chunk_size'], options['pause'])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+            for name, count in results.items():
+                self.stdout.write(f"{name}: {count} row(s)")
+
+            if not options['every']:
+                break
+            time.sleep(options['every'])
@@ -0,0 +1,85 @@
+"""
+Menu Cards
+Rendered menu item cards cached per item and catalog version.
+
+The menu page and the home page show a card per item that depends only on
+the item, so each card is rendered once and kept in one cached dict per
+(card template, catalog version), item id -> card. A page reads the dict
+with one get, renders only the items it lacks and writes it back with one
+set, so a cold page costs the same two cache calls as a warm one plus the
+rendering (the database cache writes a row per key). A 100 item menu is
+then a concatenation of 100 cached strings.
+
+Anything that changes menu items bumps the catalog version (menu_sync and
+image_sync call invalidate_menu_caches(), main/signals.py does for every
+other save or delete), which retires every card at once without deleting
+keys one by one. Cards still expire after CARD_CACHE_TIMEOUT, like the
+rankings, so a change made with a bare queryset.update() shows within
+minutes.
+
+The add to basket forms need the per-request CSRF token, so cards are
+cached with a placeholder that is swapped for the token on the way out.
+"""
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from .metrics import inc
+
+VERSION_KEY = 'catalog_version'
+CARD_CACHE_TIMEOUT = 300  # As rankings.CACHE_TIMEOUT
+CSRF_PLACEHOLDER = '<!--csrf-input-->'
+MENU_CARD = 'main/includes/menu_card.html'
+HOME_CARD = 'main/includes/home_menu_card.html'
+
+
+def catalog_version():
+    """Current catalog version, part of every card key"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version():
+    """Retire every cached card"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Not set yet (or evicted): any fresh value works as long as it is new
+        cache.set(VERSION_KEY, catalog_version() + 1, None)
+
+
+def _cards_key(template_name, version):
+    return f'menu_cards:{template_name}:{version}'
+
+
+def menu_cards(request, items, template_name=MENU_CARD):
+    """
+    Rendered card for each item, in the order given
+
+    Returns:
+        list: Safe HTML strings
+    """
+    key = _cards_key(template_name, catalog_version())
+    cards = cache.get(key) or {}
+    missing = [item for item in items if item.id not in cards]
+    inc('cache_requests_total', len(items) - len(missing), cache='menu_card', result='hit')
+    inc('cache_requests_total', len(missing), cache='menu_card', result='miss')
+
+    if missing:
+        # Pages showing different items add to the same dict, the last writer wins
+        cards = {
+            **cards,
+            **{
+                item.id: render_to_string(template_name, {'item': item, 'csrf_input': mark_safe(CSRF_PLACEHOLDER)})
+                for item in missing
+            },
+        }
+        cache.set(key, cards, CARD_CACHE_TIMEOUT)
+
+    csrf_input = format_html('<input type="hidden" name="csrfmiddlewaretoken" value="{}">', get_token(request))
+    return [mark_safe(cards[item.id].replace(CSRF_PLACEHOLDER, csrf_input)) for item in items]
@@ -0,0 +1,213 @@
+"""
+Menu Sync
+Load the menu from a JSON, CSV or YAML file and apply it as a diff.
+
+Menu items are matched on their name. sync_menu() compares the file with
+the database, then writes every added or changed item with one bulk
+upsert (INSERT ... ON CONFLICT (name) DO UPDATE) inside one transaction.
+Items missing from the file are left alone unless remove_missing is set,
+in which case they are marked unavailable; they are never deleted because
+order history references them. Cached menu data is invalidated once after
+the transaction commits; the command runs in its own process, so this only
+reaches the web workers through a shared cache (settings.CACHES).
+
+export_menu() writes the current menu in the same formats, so the usual
+workflow is export, edit, sync. Reading YAML requires PyYAML.
+"""
+import csv
+import io
+import json
+import os
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from . import rankings
+from .menu_cards import bump_catalog_version
+from .models import MenuItem
+
+FIELDS = ('name', 'description', 'category', 'price', 'ingredients', 'allergens', 'is_available')
+FORMATS = ('json', 'csv', 'yaml')
+_CATEGORIES = {value for value, _ in MenuItem.CATEGORY_CHOICES}
+_TRUE = {'1', 'true', 'yes', 'y'}
+_FALSE = {'0', 'false', 'no', 'n', ''}
+
+
+def menu_format(path):
+    """File format from the extension of path"""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    extension = 'yaml' if extension == 'yml' else extension
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported menu file '{path}', use .json, .csv or .yaml")
+    return extension
+
+
+def _yaml():
+    try:
+        import yaml
+    except ImportError:
+        raise RuntimeError('YAML menu files require PyYAML (pip install pyyaml)')
+    return yaml
+
+
+# ==================== READING ====================
+
+def read_menu(path):
+    """Raw rows (dicts) from a menu file; JSON and YAML may be a list or {'items': [...]}"""
+    file_format = menu_format(path)
+    with open(path, encoding='utf-8', newline='') as f:
+        if file_format == 'csv':
+            return list(csv.DictReader(f))
+        data = json.load(f) if file_format == 'json' else _yaml().safe_load(f)
+    if isinstance(data, dict):
+        data = data.get('items')
+    if not isinstance(data, list):
+        raise ValueError(f"'{path}' must contain a list of menu items")
+    return data
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"'{value}' is not a yes/no value")
+
+
+def clean_rows(rows):
+    """
+    Validate raw rows and convert them to model values
+
+    Raises:
+        ValueError: Listing every invalid row (rows are numbered from 1)
+    """
+    cleaned, errors, seen = [], [], set()
+    for number, row in enumerate(rows, 1):
+        if not isinstance(row, dict):
+            errors.append(f'row {number}: expected a mapping of fields')
+            continue
+        unknown = set(row) - set(FIELDS)
+        name = str(row.get('name') or '').strip()
+        values = {
+            'name': name,
+            'description': str(row.get('description') or '').strip(),
+            'category': str(row.get('category') or '').strip(),
+            'ingredients': str(row.get('ingredients') or '').strip(),
+            'allergens': str(row.get('allergens') or '').strip(),
+        }
+        problems = []
+        if unknown:
+            problems.append(f"unknown fields {', '.join(sorted(unknown))}")
+        if not name:
+            problems.append('name is required')
+        elif name in seen:
+            problems.append(f"'{name}' appears more than once")
+        seen.add(name)
+        if values['category'] not in _CATEGORIES:
+            problems.append(f"category must be one of {', '.join(sorted(_CATEGORIES))}")
+        try:
+            values['price'] = Decimal(str(row.get('price'))).quantize(Decimal('0.01'))
+            if values['price'] < Decimal('0.01'):
+                problems.append('price must be at least 0.01')
+        except InvalidOperation:
+            problems.append(f"invalid price '{row.get('price')}'")
+        try:
+            values['is_available'] = _boolean(row.get('is_available', True))
+        except ValueError as e:
+            problems.append(str(e))
+        if problems:
+            errors.append(f"row {number} ({name or 'no name'}): {'; '.join(problems)}")
+        else:
+            cleaned.append(values)
+    if errors:
+        raise ValueError('Invalid menu file:\n' + '\n'.join(errors))
+    return cleaned
+
+
+# ==================== SYNC ====================
+
+def invalidate_menu_caches():
+    """Drop cached data built from menu items"""
+    cache.delete(rankings.CACHE_KEY)
+    bump_catalog_version()
+
+
+def plan_sync(rows, remove_missing=False):
+    """
+    Compare cleaned rows with the database
+
+    Returns:
+        dict: 'added' and 'changed' rows, 'changes' {name: [fields]}, 'removed' names, 'unchanged' count
+    """
+    current = {item['name']: item for item in MenuItem.objects.values(*FIELDS)}
+    plan = {'added': [], 'changed': [], 'changes': {}, 'removed': [], 'unchanged': 0}
+    for row in rows:
+        existing = current.get(row['name'])
+        if existing is None:
+            plan['added'].append(row)
+            continue
+        fields = [field for field in FIELDS if row[field] != existing[field]]
+        if fields:
+            plan['changed'].append(row)
+            plan['changes'][row['name']] = fields
+        else:
+            plan['unchanged'] += 1
+    if remove_missing:
+        names = {row['name'] for row in rows}
+        plan['removed'] = sorted(
+            name for name, item in current.items() if name not in names and item['is_available']
+        )
+    return plan
+
+
+def sync_menu(rows, remove_missing=False, dry_run=False):
+    """
+    Apply cleaned rows to the menu in one transaction
+
+    Returns:
+        dict: The plan from plan_sync(), applied unless dry_run
+    """
+    with transaction.atomic():
+        plan = plan_sync(rows, remove_missing)
+        if dry_run:
+            return plan
+        upserts = plan['added'] + plan['changed']
+        if upserts:
+            conflict_target = {}
+            if connection.features.supports_update_conflicts_with_target:
+                conflict_target['unique_fields'] = ['name']
+            MenuItem.objects.bulk_create(
+                [MenuItem(**row) for row in upserts],
+                update_conflicts=True,
+                update_fields=[field for field in FIELDS if field != 'name'],
+                batch_size=500,
+                **conflict_target,
+            )
+        if plan['removed']:
+            MenuItem.objects.filter(name__in=plan['removed']).update(is_available=False)
+        if upserts or plan['removed']:
+            transaction.on_commit(invalidate_menu_caches)
+    return plan
+
+
+# ==================== EXPORT ====================
+
+def export_menu(file_format):
+    """The current menu as text in file_format, ordered like the menu page"""
+    rows = [
+        {**item, 'price': str(item['price'])}
+        for item in MenuItem.objects.order_by('category', 'name').values(*FIELDS)
+    ]
+    if file_format == 'json':
+        return json.dumps(rows, indent=2, ensure_ascii=False) + '\n'
+    if file_format == 'yaml':
+        return _yaml().safe_dump(rows, sort_keys=False, allow_unicode=True)
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
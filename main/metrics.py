@@ -0,0 +1,198 @@
+"""
+Request Metrics
+In-process counters and histograms exposed in the Prometheus text format.
+
+MetricsMiddleware records request latency per URL name together with the
+number and time of database queries. The InstrumentedDjangoTemplates
+backend times template rendering, and notification senders and cache
+readers call observe()/inc() directly. Everything lands in one in-memory
+registry behind a lock, which costs a few microseconds per request.
+
+With several worker processes each worker has its own registry. Setting
+METRICS_MULTIPROCESS_DIR makes every worker write a snapshot there (at
+most once per METRICS_FLUSH_SECONDS), and the /metrics endpoint sums the
+snapshots of all workers.
+"""
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_HELP = {
+    'http_request_duration_seconds': ('histogram', 'Request latency by URL name, method and status'),
+    'db_queries_total': ('counter', 'Database queries executed by URL name'),
+    'db_query_duration_seconds_total': ('counter', 'Time spent in database queries by URL name'),
+    'template_render_duration_seconds': ('histogram', 'Template render time by template'),
+    'cache_requests_total': ('counter', 'Cache lookups by cache key prefix and result'),
+    'notification_duration_seconds': ('histogram', 'Outbound notification latency by channel'),
+    'nplusone_queries_total': ('counter', 'Repeated queries (N+1) in sampled requests by URL name'),
+    'log_records_dropped_total': ('counter', 'Log records dropped because the log queue was full'),
+}
+
+
+class Registry:
+    """Counters and histograms keyed by (metric name, sorted label pairs)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.last_flush = 0
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect_left(DURATION_BUCKETS, value)
+        with self._lock:
+            # Per-bucket counts (not cumulative), then +Inf, then sum
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * (len(DURATION_BUCKETS) + 2)
+            histogram[index] += 1
+            histogram[-1] += value
+
+    def snapshot(self):
+        """JSON-serialisable copy of every series"""
+        with self._lock:
+            return {
+                'counters': [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, dict(labels), list(values)] for (name, labels), values in self.histograms.items()],
+            }
+
+
+registry = Registry()
+inc = registry.inc
+observe = registry.observe
+
+
+@contextmanager
+def timed(name, **labels):
+    """Observe the duration of the block in histogram name"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+
+def count_cache(prefix, hit):
+    """Count a cache lookup for keys starting with prefix"""
+    inc('cache_requests_total', cache=prefix, result='hit' if hit else 'miss')
+
+
+def _multiprocess_dir():
+    return getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+
+
+def maybe_flush(force=False):
+    """In multi-worker mode, write this worker's snapshot if the last one is stale"""
+    directory = _multiprocess_dir()
+    if not directory:
+        return
+    now = time.monotonic()
+    if not force and now - registry.last_flush < getattr(settings, 'METRICS_FLUSH_SECONDS', 1):
+        return
+    registry.last_flush = now
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'metrics-{os.getpid()}.json')
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump(registry.snapshot(), f)
+    os.replace(f'{path}.tmp', path)
+
+
+def collect():
+    """Snapshot of this worker, or the sum over all workers in multi-worker mode"""
+    directory = _multiprocess_dir()
+    if not directory:
+        return registry.snapshot()
+
+    maybe_flush(force=True)
+    counters, histograms = {}, {}
+    for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(sorted(labels.items())))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, values in snapshot['histograms']:
+            key = (name, tuple(sorted(labels.items())))
+            merged = histograms.setdefault(key, [0] * len(values))
+            histograms[key] = [a + b for a, b in zip(merged, values)]
+    return {
+        'counters': [[name, dict(labels), value] for (name, labels), value in counters.items()],
+        'histograms': [[name, dict(labels), values] for (name, labels), values in histograms.items()],
+    }
+
+
+def _labels(labels, **extra):
+    pairs = {**labels, **extra}
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in pairs.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def render_prometheus(snapshot):
+    """Prometheus text exposition format (version 0.0.4) for a snapshot"""
+    def by_labels(entry):
+        return str(sorted(entry[1].items()))
+
+    series = {}
+    for name, labels, value in sorted(snapshot['counters'], key=by_labels):
+        series.setdefault(name, []).append(f'{name}{_labels(labels)} {value}')
+    for name, labels, values in sorted(snapshot['histograms'], key=by_labels):
+        lines = series.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip(DURATION_BUCKETS, values):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(labels, le=bound)} {cumulative}')
+        cumulative += values[-2]
+        lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {cumulative}')
+        lines.append(f'{name}_sum{_labels(labels)} {values[-1]}')
+        lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+
+    output = []
+    for name in sorted(series):
+        kind, help_text = METRIC_HELP.get(name, ('untyped', name))
+        output.append(f'# HELP {name} {help_text}')
+        output.append(f'# TYPE {name} {kind}')
+        output.extend(series[name])
+    return '\n'.join(output) + '\n'
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed('template_render_duration_seconds', template=self.origin.template_name):
+            return super().render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django template backend that times every top-level template render"""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,162 @@
+"""
+Middleware
+Request instrumentation, see main/log.py, main/metrics.py, main/profiling.py and main/nplusone.py.
+"""
+import random
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.urls import reverse
+
+from . import metrics, nplusone, profiling
+from .identifiers import new_identifier
+from .log import request_id
+
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+class RequestIdMiddleware:
+    """
+    Tag the request with an id for log correlation, taken from the
+    X-Request-ID header when REQUEST_ID_HEADER_TRUSTED (set by our proxy),
+    otherwise new, and return it in the X-Request-ID response header
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        self.trust_header = getattr(settings, 'REQUEST_ID_HEADER_TRUSTED', False)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = request_id.set(self._request_id(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id.reset(token)
+        response['X-Request-ID'] = request.request_id
+        return response
+
+    async def __acall__(self, request):
+        token = request_id.set(self._request_id(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_id.reset(token)
+        response['X-Request-ID'] = request.request_id
+        return response
+
+    def _request_id(self, request):
+        header = request.headers.get('X-Request-ID', '')
+        request.request_id = header if self.trust_header and _REQUEST_ID.match(header) else new_identifier()
+        return request.request_id
+
+
+class MetricsMiddleware:
+    """
+    Record latency, query count and query time for every request by URL name
+
+    Sync only: under ASGI Django runs it in a thread and sync views run in
+    that same thread, so the query wrapper on its connection sees them.
+    """
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0, 0.0]
+
+        def count_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries[0] += 1
+                queries[1] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - started, queries)
+        return response
+
+    def _record(self, request, response, duration, queries):
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        metrics.observe(
+            'http_request_duration_seconds', duration,
+            view=view, method=request.method, status=response.status_code,
+        )
+        metrics.inc('db_queries_total', queries[0], view=view)
+        metrics.inc('db_query_duration_seconds_total', queries[1], view=view)
+        metrics.maybe_flush()
+
+
+class ProfilerMiddleware:
+    """
+    Profile a request when a staff user asks for it (?profile=1 or an
+    X-Profile header) or when it is sampled, see main/profiling.py
+
+    Requests that are not profiled only pay for the trigger checks. Sync
+    only, like MetricsMiddleware, so views served through ASGI run in its
+    thread where cProfile and the query wrapper can see them.
+    """
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILER_SAMPLE_RATE', 0)
+        self.query_param = getattr(settings, 'PROFILER_QUERY_PARAM', 'profile')
+
+    def __call__(self, request):
+        if not self._triggered(request):
+            return self.get_response(request)
+
+        response, report_id = profiling.profile_request(request, self.get_response)
+        if report_id:
+            response['X-Profile-Report'] = reverse('main:admin_profile_detail', args=[report_id])
+        return response
+
+    def _triggered(self, request):
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        requested = self.query_param in request.GET or 'X-Profile' in request.headers
+        return requested and request.user.is_authenticated and (request.user.is_staff or request.user.is_superuser)
+
+
+class NPlusOneMiddleware:
+    """
+    Log queries repeated within a sampled request, see main/nplusone.py
+
+    Sync only, like MetricsMiddleware, so the tracker sees the queries of
+    views served through ASGI.
+    """
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'NPLUSONE_SAMPLE_RATE', 0)
+        self.threshold = getattr(settings, 'NPLUSONE_THRESHOLD', 5)
+
+    def __call__(self, request):
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        with nplusone.QueryTracker() as tracker:
+            response = self.get_response(request)
+        offenders = tracker.offenders(self.threshold)
+        if offenders:
+            nplusone.report(request, offenders)
+        return response
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuItemRanking',
+            fields=[
+                ('menu_item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='main.menuitem')),
+                ('score', models.FloatField(default=0, help_text='Quantity sold, weighted by recency')),
+                ('quantity', models.IntegerField(default=0, help_text='Quantity sold in the window')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-score'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_menuitemranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuItemPairing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.IntegerField(default=0, help_text='Orders containing both items')),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pairings', to='main.menuitem')),
+                ('paired_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='paired_from', to='main.menuitem')),
+            ],
+            options={
+                'ordering': ['menu_item', '-count'],
+                'indexes': [models.Index(fields=['menu_item', '-count'], name='pairing_item_count_idx')],
+                'unique_together': {('menu_item', 'paired_item')},
+            },
+        ),
+    ]
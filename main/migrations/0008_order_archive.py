@@ -0,0 +1,56 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_reservation_no_show_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('order_number', models.CharField(max_length=32, unique=True)),
+                ('order_type', models.CharField(choices=[('delivery', 'Delivery'), ('collection', 'Collection')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('preparing', 'Preparing'), ('ready', 'Ready for Collection'), ('out_for_delivery', 'Out for Delivery'), ('delivered', 'Delivered'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('guest_name', models.CharField(blank=True, max_length=200)),
+                ('guest_email', models.EmailField(blank=True, max_length=254)),
+                ('guest_phone', models.CharField(blank=True, max_length=20)),
+                ('delivery_address', models.TextField(blank=True)),
+                ('collection_time', models.DateTimeField(blank=True, null=True)),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('delivery_fee', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('total', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('payment_method', models.CharField(default='card', max_length=50)),
+                ('payment_token', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('quantity', models.PositiveIntegerField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.menuitem')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='main.archivedorder')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['user', '-created_at'], name='archived_order_user_idx'),
+        ),
+    ]
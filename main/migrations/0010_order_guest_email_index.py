@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_order_user_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['guest_email', 'created_at'], name='order_guest_email_created_idx'),
+        ),
+    ]
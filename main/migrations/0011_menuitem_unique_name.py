@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:06
+
+from django.db import migrations, models
+
+
+def rename_duplicates(apps, schema_editor):
+    """Number repeated names (oldest keeps the name) so the unique index can be built"""
+    MenuItem = apps.get_model('main', 'MenuItem')
+    seen = set()
+    for item in MenuItem.objects.order_by('id').only('id', 'name'):
+        name, copy = item.name, 1
+        while name in seen:
+            copy += 1
+            name = f'{item.name[:190]} ({copy})'
+        if name != item.name:
+            MenuItem.objects.filter(id=item.id).update(name=name)
+        seen.add(name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_order_guest_email_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='menuitem',
+            name='name',
+            field=models.CharField(max_length=200, unique=True),
+        ),
+    ]
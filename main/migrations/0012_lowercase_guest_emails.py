@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:02
+
+from django.db import migrations
+from django.db.models.functions import Lower, Trim
+
+
+def lowercase_guest_emails(apps, schema_editor):
+    """Store existing guest emails the way new ones are (see tracking.normalize_email)"""
+    for model_name in ('Order', 'ArchivedOrder', 'Reservation'):
+        model = apps.get_model('main', model_name)
+        model.objects.exclude(guest_email='').update(guest_email=Lower(Trim('guest_email')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_menuitem_unique_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_guest_emails, migrations.RunPython.noop),
+    ]
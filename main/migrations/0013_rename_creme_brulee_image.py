@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:20
+
+from django.db import migrations
+
+OLD_NAME = 'menu_items/classic cream brucee.jfif'
+NEW_NAME = 'menu_items/Classic Creme Brulee.jfif'
+
+
+def rename_image(apps, schema_editor):
+    """Point items at the renamed crème brûlée image (the old file no longer exists)"""
+    MenuItem = apps.get_model('main', 'MenuItem')
+    MenuItem.objects.filter(image=OLD_NAME).update(image=NEW_NAME)
+
+
+def restore_image(apps, schema_editor):
+    MenuItem = apps.get_model('main', 'MenuItem')
+    MenuItem.objects.filter(image=NEW_NAME).update(image=OLD_NAME)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_lowercase_guest_emails'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_image, restore_image),
+    ]
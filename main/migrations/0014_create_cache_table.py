@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:40
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    """Create the DatabaseCache table of settings.CACHES (does nothing for other backends or if it exists)"""
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_rename_creme_brulee_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,27 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from decimal import Decimal
+from .identifiers import new_identifier
+
+IDENTIFIER_ATTEMPTS = 3
+
+
+def _save_with_new_identifier(instance, field, save):
+    """
+    Insert instance with a new identifier in field, drawing another one if
+    a different process took the same number first
+    """
+    for attempt in range(IDENTIFIER_ATTEMPTS):
+        setattr(instance, field, new_identifier())
+        try:
+            with transaction.atomic():
+                save()
+            return
+        except IntegrityError:
+            taken = type(instance).objects.filter(**{field: getattr(instance, field)}).exists()
+            if not taken or attempt == IDENTIFIER_ATTEMPTS - 1:
+                raise
 
 
 class UserProfile(models.Model):
@@ -24,7 +44,7 @@ class MenuItem(models.Model):
         ('drink', 'Drinks'),
     ]
     
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, unique=True)  # Natural key for menu_sync
     description = models.TextField()
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
     price = models.DecimalField(max_digits=6, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
@@ -90,6 +110,11 @@ class Order(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='order_status_updated_idx'),
+            models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
+            models.Index(fields=['guest_email', 'created_at'], name='order_guest_email_created_idx'),
+        ]
     
     def __str__(self):
         if self.user:
@@ -98,10 +123,10 @@ class Order(models.Model):
             return f"Order {self.order_number} - Guest ({self.guest_name})"
     
     def save(self, *args, **kwargs):
-        if not self.order_number:
-            import uuid
-            self.order_number = uuid.uuid4().hex[:16].upper()
-        super().save(*args, **kwargs)
+        if self.order_number:
+            super().save(*args, **kwargs)
+        else:
+            _save_with_new_identifier(self, 'order_number', lambda: super(Order, self).save(*args, **kwargs))
 
 
 class OrderItem(models.Model):
@@ -125,6 +150,7 @@ class Reservation(models.Model):
         ('confirmed', 'Confirmed'),
         ('cancelled', 'Cancelled'),
         ('completed', 'Completed'),
+        ('no_show', 'No Show'),
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reservations', null=True, blank=True)
@@ -146,6 +172,9 @@ class Reservation(models.Model):
     class Meta:
         ordering = ['date', 'time']
         unique_together = ['date', 'time']  # Prevent double bookings
+        indexes = [
+            models.Index(fields=['status', 'date'], name='reservation_status_date_idx'),
+        ]
     
     def __str__(self):
         if self.user:
@@ -154,7 +183,117 @@ class Reservation(models.Model):
             return f"Reservation {self.reservation_number} - Guest ({self.guest_name}) on {self.date}"
     
     def save(self, *args, **kwargs):
-        if not self.reservation_number:
-            import uuid
-            self.reservation_number = uuid.uuid4().hex[:16].upper()
-        super().save(*args, **kwargs)
+        if self.reservation_number:
+            super().save(*args, **kwargs)
+        else:
+            _save_with_new_identifier(
+                self, 'reservation_number', lambda: super(Reservation, self).save(*args, **kwargs),
+            )
+
+
+class DailySales(models.Model):
+    """Rollup of orders per day and order type (cancelled orders excluded)"""
+    date = models.DateField()
+    order_type = models.CharField(max_length=20, choices=Order.ORDER_TYPE_CHOICES)
+    order_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    class Meta:
+        ordering = ['date', 'order_type']
+        unique_together = ['date', 'order_type']
+    
+    def __str__(self):
+        return f"{self.date} {self.order_type}: {self.order_count} orders, £{self.revenue}"
+
+
+class DailyItemSales(models.Model):
+    """Rollup of order lines per day and menu item (cancelled orders excluded)"""
+    date = models.DateField()
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name='daily_sales')
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    order_count = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['date', 'menu_item']
+        unique_together = ['date', 'menu_item']
+    
+    def __str__(self):
+        return f"{self.date} {self.menu_item.name}: {self.quantity} sold, £{self.revenue}"
+
+
+class MenuItemRanking(models.Model):
+    """Precomputed sales ranking used for the home page (see main/rankings.py)"""
+    menu_item = models.OneToOneField(MenuItem, on_delete=models.CASCADE, primary_key=True, related_name='ranking')
+    score = models.FloatField(default=0, help_text="Quantity sold, weighted by recency")
+    quantity = models.IntegerField(default=0, help_text="Quantity sold in the window")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-score']
+    
+    def __str__(self):
+        return f"{self.menu_item.name}: {self.score:.1f}"
+
+
+class MenuItemPairing(models.Model):
+    """How often two menu items were ordered together (see main/recommendations.py)"""
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name='pairings')
+    paired_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name='paired_from')
+    count = models.IntegerField(default=0, help_text="Orders containing both items")
+    
+    class Meta:
+        ordering = ['menu_item', '-count']
+        unique_together = ['menu_item', 'paired_item']
+        indexes = [
+            models.Index(fields=['menu_item', '-count'], name='pairing_item_count_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.menu_item.name} + {self.paired_item.name}: {self.count}"
+
+
+class ArchivedOrder(models.Model):
+    """Completed/cancelled orders moved out of Order by the archive_orders job (see main/archive.py)"""
+    id = models.BigIntegerField(primary_key=True)  # Same id as the original Order
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_orders', null=True, blank=True)
+    order_number = models.CharField(max_length=32, unique=True)
+    order_type = models.CharField(max_length=20, choices=Order.ORDER_TYPE_CHOICES)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    guest_name = models.CharField(max_length=200, blank=True)
+    guest_email = models.EmailField(blank=True)
+    guest_phone = models.CharField(max_length=20, blank=True)
+    delivery_address = models.TextField(blank=True)
+    collection_time = models.DateTimeField(blank=True, null=True)
+    subtotal = models.DecimalField(max_digits=8, decimal_places=2)
+    delivery_fee = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    total = models.DecimalField(max_digits=8, decimal_places=2)
+    payment_method = models.CharField(max_length=50, default='card')
+    payment_token = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='archived_order_user_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Archived order {self.order_number}"
+
+
+class ArchivedOrderItem(models.Model):
+    """Order lines of an ArchivedOrder"""
+    id = models.BigIntegerField(primary_key=True)  # Same id as the original OrderItem
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='items')
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    price = models.DecimalField(max_digits=6, decimal_places=2)
+    
+    def __str__(self):
+        return f"{self.quantity}x {self.menu_item.name} in archived order {self.order.order_number}"
+    
+    def get_total(self):
+        return self.quantity * self.price
@@ -0,0 +1,82 @@
+"""
+Customer Status Notifications
+Build status update emails and send them in one batch over a single mail connection
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
+
+def _recipient(row, default_name):
+    """Pick the email address and display name for an order/reservation row"""
+    email = row.get('guest_email') or row.get('user__email') or ''
+    name = row.get('guest_name') or row.get('user__username') or default_name
+    return email, name
+
+
+def build_order_status_messages(rows, status_label):
+    """
+    Build status update emails for orders
+
+    Args:
+        rows: dicts with order_number, guest_email, guest_name, user__email, user__username
+        status_label: Human readable status (e.g. "Completed")
+
+    Returns:
+        list: EmailMessage objects, one per order that has an email address
+    """
+    messages = []
+    for row in rows:
+        email, name = _recipient(row, 'Customer')
+        if not email:
+            continue
+        messages.append(EmailMessage(
+            f'Order Status Update - {row["order_number"]}',
+            f'Hi {name},\n\nYour order status has been updated to: {status_label}\n\nOrder Number: {row["order_number"]}',
+            settings.DEFAULT_FROM_EMAIL,
+            [email],
+        ))
+    return messages
+
+
+def build_reservation_status_messages(rows, status_label):
+    """
+    Build status update emails for reservations
+
+    Args:
+        rows: dicts with reservation_number, guest_email, guest_name, user__email, user__username
+        status_label: Human readable status (e.g. "Completed")
+
+    Returns:
+        list: EmailMessage objects, one per reservation that has an email address
+    """
+    messages = []
+    for row in rows:
+        email, name = _recipient(row, 'Guest')
+        if not email:
+            continue
+        messages.append(EmailMessage(
+            f'Reservation Status Update - {row["reservation_number"]}',
+            f'Hi {name},\n\nYour reservation status has been updated to: {status_label}\n\nReservation Number: {row["reservation_number"]}',
+            settings.DEFAULT_FROM_EMAIL,
+            [email],
+        ))
+    return messages
+
+
+def send_notification_batch(messages):
+    """Send all messages over one mail connection, returns the number sent"""
+    if not messages:
+        return 0
+    try:
+        with timed('notification_duration_seconds', channel='email'):
+            return get_connection().send_messages(messages) or 0
+    except Exception:
+        # Status changes are saved already, a failed email must not undo them
+        logger.exception('Status notification batch failed', extra={'messages': len(messages)})
+        return 0
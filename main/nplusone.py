@@ -0,0 +1,106 @@
+"""
+N+1 Query Detection
+Find structurally identical queries repeated within one request.
+
+A loop that touches a relation per row, e.g. {{ order.user.username }} in
+a table or MenuItem.objects.get() per basket line, runs the same SQL with
+different parameters once per row. QueryTracker counts queries by their
+SQL with IN lists collapsed and remembers where each came from: the
+template line being rendered if there is one, otherwise the innermost line
+of project code.
+
+NPlusOneMiddleware (main/middleware.py) tracks a sample of requests
+(NPLUSONE_SAMPLE_RATE) and logs every query repeated at least
+NPLUSONE_THRESHOLD times, so new hot spots show up from real traffic.
+"""
+import logging
+import os
+import re
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.template.base import Node
+
+from . import metrics
+from .profiling import query_origin
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+_TEMPLATE_BASE = os.path.join('django', 'template', 'base.py')
+
+
+def normalize(sql):
+    """SQL with IN lists of any length and whitespace collapsed"""
+    return _WHITESPACE.sub(' ', _IN_LIST.sub('(%s, ...)', sql)).strip()
+
+
+def template_origin():
+    """'template:line' of the innermost template node being rendered, or ''"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code.co_filename.endswith(_TEMPLATE_BASE):
+            node = frame.f_locals.get('self')
+            if isinstance(node, Node) and getattr(node, 'token', None) is not None:
+                name = node.origin.name if node.origin else '<unknown>'
+                if os.path.isabs(str(name)):
+                    name = os.path.relpath(name, settings.BASE_DIR)
+                return f'{name}:{node.token.lineno}'
+        frame = frame.f_back
+    return ''
+
+
+class QueryTracker:
+    """
+    Count the queries run on the default connection while active
+
+    with QueryTracker() as tracker:
+        ...
+    tracker.offenders(threshold=5)
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.origins = {}
+        self._wrapper = None
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self._record)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+
+    def _record(self, execute, sql, params, many, context):
+        key = normalize(sql)
+        self.counts[key] += 1
+        self.origins.setdefault(key, Counter())[template_origin() or query_origin()] += 1
+        return execute(sql, params, many, context)
+
+    def offenders(self, threshold):
+        """Queries run at least threshold times, most repeated first"""
+        return [
+            {
+                'sql': sql,
+                'count': count,
+                'origins': [origin or '<unknown>' for origin, _ in self.origins[sql].most_common(3)],
+            }
+            for sql, count in self.counts.most_common()
+            if count >= threshold
+        ]
+
+
+def report(request, offenders):
+    """Log offenders of a request and count them per view in the metrics"""
+    match = request.resolver_match
+    view = match.view_name if match else 'unmatched'
+    for offender in offenders:
+        metrics.inc('nplusone_queries_total', offender['count'], view=view)
+        logger.warning(
+            'N+1 in %s %s (%s): %d x %s from %s',
+            request.method, request.path, view, offender['count'], offender['sql'], ', '.join(offender['origins']),
+        )
@@ -0,0 +1,77 @@
+"""
+Reservation Occupancy Analytics
+Day-of-week x time-slot matrix of bookings, covers, cancellations and no-shows.
+
+The matrix for a date range comes from one grouped query and is cached
+per range, so the heatmap can be reloaded freely while planning rotas.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractIsoWeekDay
+
+from .metrics import count_cache
+from .models import Reservation
+
+CACHE_TIMEOUT = 600
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+METRICS = [
+    ('bookings', 'Bookings'),
+    ('covers', 'Covers'),
+    ('cancellations', 'Cancellations'),
+    ('no_shows', 'No-shows'),
+]
+
+
+def occupancy_matrix(start, end):
+    """
+    Reservation counts per weekday and time slot between start and end (inclusive)
+
+    Returns:
+        dict: 'slots' (sorted times), 'cells' {metric: 7 x len(slots) list of ints},
+              'totals' {metric: int}
+    """
+    cache_key = f'occupancy:{start.isoformat()}:{end.isoformat()}'
+    matrix = cache.get(cache_key)
+    count_cache('occupancy', matrix is not None)
+    if matrix is not None:
+        return matrix
+
+    rows = (
+        Reservation.objects
+        .filter(date__range=(start, end))
+        .annotate(weekday=ExtractIsoWeekDay('date'))
+        .values('weekday', 'time')
+        .annotate(
+            bookings=Count('id', filter=~Q(status='cancelled')),
+            covers=Sum('guests', filter=~Q(status__in=['cancelled', 'no_show']), default=0),
+            cancellations=Count('id', filter=Q(status='cancelled')),
+            no_shows=Count('id', filter=Q(status='no_show')),
+        )
+        .order_by()
+    )
+    rows = list(rows)
+
+    slots = sorted({row['time'] for row in rows})
+    slot_index = {slot: index for index, slot in enumerate(slots)}
+    cells = {metric: [[0] * len(slots) for _ in WEEKDAYS] for metric, _ in METRICS}
+    for row in rows:
+        for metric, _ in METRICS:
+            cells[metric][row['weekday'] - 1][slot_index[row['time']]] = row[metric] or 0
+
+    matrix = {
+        'slots': slots,
+        'cells': cells,
+        'totals': {metric: sum(map(sum, cells[metric])) for metric, _ in METRICS},
+    }
+    cache.set(cache_key, matrix, CACHE_TIMEOUT)
+    return matrix
+
+
+def heatmap_rows(matrix, metric):
+    """Rows of (weekday, [(value, intensity 0-1)]) for rendering one metric"""
+    values = matrix['cells'][metric]
+    peak = max((max(row) for row in values if row), default=0) or 1
+    return [
+        (weekday, [(value, round(value / peak, 2)) for value in row])
+        for weekday, row in zip(WEEKDAYS, values)
+    ]
@@ -0,0 +1,126 @@
+"""
+Kitchen Prep Queue
+Open order lines (paid/preparing orders) aggregated by dish.
+
+The queue is loaded with one grouped query (the quantity of each dish per
+open order, summed by the database) and then kept up to date in memory
+from the kitchen events published by this process: a new order adds its
+quantities to its dishes, an order leaving prep takes them away again.
+Because other workers publish their own events, the snapshot is also
+reloaded every PREP_QUEUE_REFRESH_SECONDS.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .events import add_listener
+from .models import OrderItem
+
+PREP_STATUSES = ('paid', 'preparing')
+
+
+class PrepQueue:
+    """Open quantities keyed by dish, with the orders they come from"""
+
+    def __init__(self, refresh_seconds=30):
+        self.refresh_seconds = refresh_seconds
+        # menu item id -> {'menu_item_id', 'name', 'quantity', 'orders': {order id: (order_number, created_at)}}
+        self._dishes = {}
+        self._order_dishes = {}  # order id -> {menu item id: quantity}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _add(self, order_id, order_number, created_at, menu_item_id, name, quantity):
+        dish = self._dishes.setdefault(menu_item_id, {
+            'menu_item_id': menu_item_id,
+            'name': name,
+            'quantity': 0,
+            'orders': {},
+        })
+        dish['quantity'] += quantity
+        dish['orders'][order_id] = (order_number, created_at)
+        dishes = self._order_dishes.setdefault(order_id, {})
+        dishes[menu_item_id] = dishes.get(menu_item_id, 0) + quantity
+
+    def _remove(self, order_id):
+        for menu_item_id, quantity in self._order_dishes.pop(order_id, {}).items():
+            dish = self._dishes[menu_item_id]
+            dish['quantity'] -= quantity
+            del dish['orders'][order_id]
+            if not dish['orders']:
+                del self._dishes[menu_item_id]
+
+    def reload(self):
+        """Rebuild the queue from the database in one grouped query"""
+        rows = (
+            OrderItem.objects
+            .filter(order__status__in=PREP_STATUSES)
+            .values('order_id', 'order__order_number', 'order__created_at', 'menu_item_id', 'menu_item__name')
+            .annotate(total=Sum('quantity'))
+            .order_by()
+        )
+        with self._lock:
+            self._dishes, self._order_dishes = {}, {}
+            for row in rows:
+                self._add(row['order_id'], row['order__order_number'], row['order__created_at'],
+                          row['menu_item_id'], row['menu_item__name'], row['total'])
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def _is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds
+
+    def apply_event(self, event):
+        """Update the queue from an order_created / order_status event"""
+        if event.get('type') not in ('order_created', 'order_status'):
+            return
+        order_id = event['id']
+        with self._lock:
+            if event['status'] not in PREP_STATUSES:
+                self._remove(order_id)
+            elif 'items' in event:
+                created_at = event.get('created_at')
+                created_at = parse_datetime(created_at) if created_at else timezone.now()
+                self._remove(order_id)
+                for item in event['items']:
+                    self._add(order_id, event['order_number'], created_at,
+                              item['menu_item_id'], item['name'], item['quantity'])
+            elif order_id not in self._order_dishes:
+                # An order moved back into prep, its lines are not known here
+                self._loaded_at = None
+
+    def dishes(self):
+        """
+        The open quantities by dish, busiest first
+
+        Returns:
+            list: dicts with menu_item_id, name, quantity, oldest (datetime), order_numbers (oldest first)
+        """
+        if self._is_stale():
+            self.reload()
+        with self._lock:
+            dishes = [
+                {
+                    'menu_item_id': dish['menu_item_id'],
+                    'name': dish['name'],
+                    'quantity': dish['quantity'],
+                    'orders': sorted(dish['orders'].values(), key=lambda order: order[1]),
+                }
+                for dish in self._dishes.values()
+            ]
+        for dish in dishes:
+            orders = dish.pop('orders')
+            dish['oldest'] = orders[0][1]
+            dish['order_numbers'] = [order_number for order_number, _ in orders]
+        return sorted(dishes, key=lambda d: (-d['quantity'], d['oldest']))
+
+
+prep_queue = PrepQueue(refresh_seconds=getattr(settings, 'PREP_QUEUE_REFRESH_SECONDS', 30))
+add_listener(prep_queue.apply_event)
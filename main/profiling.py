@@ -0,0 +1,162 @@
+"""
+Request Profiling
+Profile single requests on demand and keep the reports for staff to browse.
+
+ProfilerMiddleware (main/middleware.py) runs a request under cProfile when
+a staff user asks for it (PROFILER_QUERY_PARAM in the query string or the
+X-Profile header) or when the request is sampled (PROFILER_SAMPLE_RATE).
+The report holds the path (without the query string, which can carry
+guest emails), the hottest functions and every SQL query (without its
+parameters) with its time and the line of project code that issued it.
+Reports are JSON files in PROFILER_DIR, newest PROFILER_KEEP kept.
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .identifiers import new_identifier
+
+logger = logging.getLogger(__name__)
+
+# cProfile can only be active in one thread at a time
+_profiler_lock = threading.Lock()
+
+# Our own query wrappers are on every stack, skip them when looking for a query's origin
+_INSTRUMENTATION_FILES = {
+    os.path.join(os.path.dirname(__file__), name) for name in ('profiling.py', 'middleware.py', 'metrics.py', 'nplusone.py')
+}
+
+
+def _directory():
+    return str(getattr(settings, 'PROFILER_DIR', 'profiles'))
+
+
+def project_stack():
+    """Frames of project code (not Django or other libraries) on the stack, outermost first"""
+    root = str(settings.BASE_DIR)
+    return [
+        f'{os.path.relpath(frame.filename, root)}:{frame.lineno} in {frame.name}'
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(root)
+        and frame.filename not in _INSTRUMENTATION_FILES
+        and 'site-packages' not in frame.filename
+    ]
+
+
+def query_origin():
+    """Innermost frame of project code on the stack"""
+    stack = project_stack()
+    return stack[-1] if stack else ''
+
+
+def profile_request(request, get_response):
+    """
+    Run get_response(request) under cProfile and save a report
+
+    Returns:
+        tuple: (response, report id or None if another request was being profiled)
+    """
+    if not _profiler_lock.acquire(blocking=False):
+        return get_response(request), None
+
+    queries = []
+
+    def record_query(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            queries.append({
+                'sql': sql,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+                'origin': query_origin(),
+            })
+
+    profiler = cProfile.Profile()
+    try:
+        started = time.perf_counter()
+        with connection.execute_wrapper(record_query):
+            profiler.enable()
+            try:
+                response = get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - started
+    finally:
+        _profiler_lock.release()
+
+    stats = io.StringIO()
+    pstats.Stats(profiler, stream=stats).strip_dirs().sort_stats('cumulative').print_stats(40)
+    report = {
+        'id': new_identifier(),
+        'created_at': timezone.now().isoformat(),
+        'method': request.method,
+        'path': request.path,
+        'view': request.resolver_match.view_name if request.resolver_match else '',
+        'user': request.user.username if request.user.is_authenticated else '',
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 1),
+        'query_count': len(queries),
+        'query_ms': round(sum(query['duration_ms'] for query in queries), 1),
+        'queries': queries,
+        'stats': stats.getvalue(),
+    }
+    return response, report['id'] if save_report(report) else None
+
+
+def save_report(report):
+    """
+    Write a report and drop the oldest beyond PROFILER_KEEP
+
+    Returns:
+        bool: False when PROFILER_DIR can't be written (logged, the request still succeeds)
+    """
+    directory = _directory()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{report['id']}.json"), 'w') as f:
+            json.dump(report, f)
+
+        keep = getattr(settings, 'PROFILER_KEEP', 50)
+        for name in sorted(os.listdir(directory), reverse=True)[keep:]:
+            os.remove(os.path.join(directory, name))
+    except OSError:
+        logger.exception('Saving the request profile failed', extra={'directory': directory})
+        return False
+    return True
+
+
+def list_reports():
+    """Summaries (no queries or stats) of the stored reports, newest first"""
+    directory = _directory()
+    if not os.path.isdir(directory):
+        return []
+    reports = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        report = load_report(name.removesuffix('.json'))
+        if report is not None:
+            report.pop('queries')
+            report.pop('stats')
+            reports.append(report)
+    return reports
+
+
+def load_report(report_id):
+    """A stored report, or None if it does not exist"""
+    if not report_id.isalnum():
+        return None
+    try:
+        with open(os.path.join(_directory(), f'{report_id}.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,93 @@
+"""
+Menu Rankings
+Featured and popular items computed from recent sales.
+
+refresh_rankings() reads the daily item rollups over a rolling window,
+weights each day's quantity by recency (exponential decay with a half-life)
+and stores the result in MenuItemRanking. It runs as the
+'refresh_menu_rankings' maintenance job. The home page reads the ready
+lists from the cache, or with one query when the cache is cold.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .maintenance import maintenance_job
+from .metrics import count_cache
+from .models import DailyItemSales, MenuItem, MenuItemRanking
+
+CACHE_KEY = 'menu_rankings'
+CACHE_TIMEOUT = 300
+
+
+def refresh_rankings(window_days=None, half_life_days=None):
+    """
+    Recompute MenuItemRanking from the last window_days of sales
+
+    Returns:
+        int: Number of ranked menu items
+    """
+    window_days = window_days or getattr(settings, 'RANKING_WINDOW_DAYS', 30)
+    half_life_days = half_life_days or getattr(settings, 'RANKING_HALF_LIFE_DAYS', 7)
+    today = timezone.localdate()
+
+    sales = (
+        DailyItemSales.objects
+        .filter(date__gt=today - timedelta(days=window_days), date__lte=today, quantity__gt=0)
+        .values_list('menu_item_id', 'date', 'quantity')
+    )
+    scores = {}
+    quantities = {}
+    for menu_item_id, date, quantity in sales:
+        age = (today - date).days
+        scores[menu_item_id] = scores.get(menu_item_id, 0) + quantity * 0.5 ** (age / half_life_days)
+        quantities[menu_item_id] = quantities.get(menu_item_id, 0) + quantity
+
+    with transaction.atomic():
+        MenuItemRanking.objects.all().delete()
+        MenuItemRanking.objects.bulk_create([
+            MenuItemRanking(menu_item_id=menu_item_id, score=score, quantity=quantities[menu_item_id])
+            for menu_item_id, score in scores.items()
+        ])
+    cache.delete(CACHE_KEY)
+    return len(scores)
+
+
+@maintenance_job('refresh_menu_rankings')
+def refresh_menu_rankings(chunk_size=None, pause=0):
+    """Maintenance job wrapper, the ranking table is small so chunking does not apply"""
+    return refresh_rankings()
+
+
+def _ranked(order_field, limit):
+    """Available items best first by order_field, topped up with the regular menu order"""
+    items = list(
+        MenuItem.objects.filter(is_available=True, ranking__isnull=False)
+        .order_by(f'-ranking__{order_field}')[:limit]
+    )
+    if len(items) < limit:
+        items += list(
+            MenuItem.objects.filter(is_available=True, ranking__isnull=True)[:limit - len(items)]
+        )
+    return items
+
+
+def home_rankings():
+    """
+    Featured (trending) and popular (best selling) items for the home page
+
+    Returns:
+        dict: 'featured' (6 items by recency-weighted score), 'popular' (8 items by quantity)
+    """
+    rankings = cache.get(CACHE_KEY)
+    count_cache(CACHE_KEY, rankings is not None)
+    if rankings is None:
+        rankings = {
+            'featured': _ranked('score', 6),
+            'popular': _ranked('quantity', 8),
+        }
+        cache.set(CACHE_KEY, rankings, CACHE_TIMEOUT)
+    return rankings
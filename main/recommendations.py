@@ -0,0 +1,156 @@
+"""
+"Pairs Well With" Recommendations
+Items frequently ordered together, from an item x item co-occurrence matrix.
+
+build_pairings() loads (order, menu item) pairs with one query per table
+(live and archived orders), builds a sparse orders x items matrix with
+SciPy and multiplies it by its transpose to count co-occurrences, keeping
+the top K neighbours per item in MenuItemPairing. NumPy and SciPy are only
+needed for this offline build (python manage.py build_recommendations),
+not for serving.
+
+New orders bump the counts of the stored pairs incrementally
+(record_order_pairings) and cancellations take them back out
+(record_pairing_status_change); new pairs only appear with the next build.
+Serving is a single indexed query (pairs_well_with).
+"""
+import itertools
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import ArchivedOrderItem, MenuItem, MenuItemPairing, OrderItem
+
+DEFAULT_TOP_K = 10
+
+
+def build_pairings(top_k=DEFAULT_TOP_K, days=365):
+    """
+    Rebuild MenuItemPairing from the last `days` days of orders
+
+    Returns:
+        int: Number of pairings stored
+    """
+    try:
+        import numpy as np
+        from scipy import sparse
+    except ImportError:
+        raise RuntimeError('Building recommendations requires numpy and scipy (pip install numpy scipy)')
+
+    since = timezone.now() - timedelta(days=days)
+    lines = itertools.chain.from_iterable(
+        model.objects
+        .exclude(order__status='cancelled')
+        .filter(order__created_at__gte=since)
+        .values_list('order_id', 'menu_item_id')
+        .distinct()
+        .order_by()
+        .iterator(chunk_size=10000)
+        for model in (OrderItem, ArchivedOrderItem)
+    )
+    pairs = np.fromiter(
+        (value for row in lines for value in row),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+
+    pairings = []
+    if len(pairs):
+        # Compact ids so the matrix is (distinct orders) x (distinct items)
+        order_ids, order_index = np.unique(pairs[:, 0], return_inverse=True)
+        item_ids, item_index = np.unique(pairs[:, 1], return_inverse=True)
+        orders = sparse.csr_matrix(
+            (np.ones(len(pairs), dtype=np.int32), (order_index, item_index)),
+            shape=(len(order_ids), len(item_ids)),
+        )
+        co_occurrence = (orders.T @ orders).tocsr()
+        co_occurrence.setdiag(0)
+        co_occurrence.eliminate_zeros()
+
+        for row in range(co_occurrence.shape[0]):
+            start, end = co_occurrence.indptr[row], co_occurrence.indptr[row + 1]
+            if start == end:
+                continue
+            counts = co_occurrence.data[start:end]
+            columns = co_occurrence.indices[start:end]
+            if len(counts) > top_k:
+                best = np.argpartition(-counts, top_k)[:top_k]
+                counts, columns = counts[best], columns[best]
+            pairings.extend(
+                MenuItemPairing(menu_item_id=int(item_ids[row]), paired_item_id=int(item_ids[col]), count=int(count))
+                for col, count in zip(columns, counts)
+            )
+
+    with transaction.atomic():
+        MenuItemPairing.objects.all().delete()
+        MenuItemPairing.objects.bulk_create(pairings, batch_size=1000)
+    return len(pairings)
+
+
+def _bump_pairings(item_sets, sign):
+    """Add sign to the count of every stored pairing found in each set of item ids"""
+    deltas = {}
+    for menu_item_ids in item_sets:
+        for pair in itertools.permutations(set(menu_item_ids), 2):
+            deltas[pair] = deltas.get(pair, 0) + sign
+    if not deltas:
+        return
+    item_ids = {item_id for pair in deltas for item_id in pair}
+    with transaction.atomic():
+        pairings = [
+            pairing for pairing in MenuItemPairing.objects.select_for_update().filter(
+                menu_item_id__in=item_ids, paired_item_id__in=item_ids,
+            )
+            if (pairing.menu_item_id, pairing.paired_item_id) in deltas
+        ]
+        for pairing in pairings:
+            pairing.count = max(pairing.count + deltas[pairing.menu_item_id, pairing.paired_item_id], 0)
+        MenuItemPairing.objects.bulk_update(pairings, ['count'], batch_size=1000)
+
+
+def record_order_pairings(menu_item_ids):
+    """
+    Count one more co-occurrence for every stored pair of items in a new order
+
+    Only pairs already in the top K are bumped; pairs that are not stored
+    yet are left to the next build_pairings() so the table stays compact.
+    """
+    _bump_pairings([menu_item_ids], 1)
+
+
+def record_pairing_status_change(rows, new_status):
+    """
+    Take cancelled orders out of the counts (and put them back when un-cancelled),
+    like build_pairings() which ignores cancelled orders
+
+    Args:
+        rows: dicts with the order 'id' and its previous 'status'
+        new_status: The status the orders were moved to
+    """
+    if new_status == 'cancelled':
+        order_ids, sign = [row['id'] for row in rows if row['status'] != 'cancelled'], -1
+    else:
+        order_ids, sign = [row['id'] for row in rows if row['status'] == 'cancelled'], 1
+    if not order_ids:
+        return
+    orders = {}
+    for order_id, menu_item_id in OrderItem.objects.filter(order_id__in=order_ids).values_list(
+        'order_id', 'menu_item_id'
+    ):
+        orders.setdefault(order_id, set()).add(menu_item_id)
+    _bump_pairings(orders.values(), sign)
+
+
+def pairs_well_with(menu_item_ids, limit=4):
+    """Available items most often ordered with any of menu_item_ids, in one query"""
+    menu_item_ids = list(menu_item_ids)
+    if not menu_item_ids:
+        return []
+    return list(
+        MenuItem.objects
+        .filter(is_available=True, paired_from__menu_item_id__in=menu_item_ids)
+        .exclude(id__in=menu_item_ids)
+        .annotate(strength=Sum('paired_from__count'))
+        .order_by('-strength', 'name')[:limit]
+    )
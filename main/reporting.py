@@ -0,0 +1,182 @@
+"""
+Sales Reporting
+Daily rollups of orders (per order type) and order lines (per menu item).
+
+Rollups are kept up to date incrementally when orders are placed or
+cancelled, and can be rebuilt for any date range with
+``python manage.py rebuild_sales_rollups`` (reading both live and archived
+orders). Reports read only the rollups.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Min, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, DailyItemSales, DailySales, Order, OrderItem
+
+LINE_REVENUE = ExpressionWrapper(
+    F('quantity') * F('price'),
+    output_field=DecimalField(max_digits=12, decimal_places=2),
+)
+
+
+def _order_aggregates(orders):
+    """Order count and revenue per day and order type"""
+    return (
+        orders.annotate(day=TruncDate('created_at'))
+        .values('day', 'order_type')
+        .annotate(order_count=Count('id'), revenue=Sum('total'))
+        .order_by()
+    )
+
+
+def _item_aggregates(items):
+    """Quantity, revenue and order count per day and menu item"""
+    return (
+        items.annotate(day=TruncDate('order__created_at'))
+        .values('day', 'menu_item_id')
+        .annotate(
+            # revenue first: once 'quantity' is annotated, F('quantity') means the sum
+            revenue=Sum(LINE_REVENUE),
+            quantity=Sum('quantity'),
+            order_count=Count('order_id', distinct=True),
+        )
+        .order_by()
+    )
+
+
+def _apply_delta(model, lookup, create, **deltas):
+    """Add deltas to the rollup row matching lookup, creating it if needed"""
+    changes = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**lookup).update(**changes) or not create:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another request created the row first
+        model.objects.filter(**lookup).update(**changes)
+
+
+def record_orders(order_ids, sign=1):
+    """
+    Add orders to the rollups (sign=1) or take them out again (sign=-1)
+
+    Works on any number of orders with two grouped queries.
+    """
+    if not order_ids:
+        return
+    with transaction.atomic():
+        for row in _order_aggregates(Order.objects.filter(id__in=order_ids)):
+            _apply_delta(
+                DailySales,
+                {'date': row['day'], 'order_type': row['order_type']},
+                create=sign > 0,
+                order_count=sign * row['order_count'],
+                revenue=sign * row['revenue'],
+            )
+        for row in _item_aggregates(OrderItem.objects.filter(order_id__in=order_ids)):
+            _apply_delta(
+                DailyItemSales,
+                {'date': row['day'], 'menu_item_id': row['menu_item_id']},
+                create=sign > 0,
+                quantity=sign * row['quantity'],
+                revenue=sign * row['revenue'],
+                order_count=sign * row['order_count'],
+            )
+
+
+def record_status_change(rows, new_status):
+    """
+    Keep the rollups in step with cancellations
+
+    Args:
+        rows: dicts with the order 'id' and its previous 'status'
+        new_status: The status the orders were moved to
+    """
+    if new_status == 'cancelled':
+        record_orders([row['id'] for row in rows if row['status'] != 'cancelled'], sign=-1)
+    else:
+        record_orders([row['id'] for row in rows if row['status'] == 'cancelled'], sign=1)
+
+
+def first_order_date():
+    """Day of the oldest order, live or archived, or None when there are none"""
+    firsts = [
+        first for first in (model.objects.aggregate(first=Min('created_at'))['first'] for model in (Order, ArchivedOrder))
+        if first is not None
+    ]
+    return timezone.localdate(min(firsts)) if firsts else None
+
+
+def rebuild_rollups(start, end):
+    """
+    Recompute the rollups for every day from start to end (inclusive)
+
+    Returns:
+        tuple: (DailySales rows, DailyItemSales rows) written
+    """
+    daily = {}
+    daily_items = {}
+    for order_model, item_model in ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem)):
+        orders = order_model.objects.exclude(status='cancelled').filter(created_at__date__range=(start, end))
+        for row in _order_aggregates(orders):
+            rollup = daily.setdefault(
+                (row['day'], row['order_type']),
+                DailySales(date=row['day'], order_type=row['order_type']),
+            )
+            rollup.order_count += row['order_count']
+            rollup.revenue += row['revenue']
+        for row in _item_aggregates(item_model.objects.filter(order__in=orders)):
+            rollup = daily_items.setdefault(
+                (row['day'], row['menu_item_id']),
+                DailyItemSales(date=row['day'], menu_item_id=row['menu_item_id']),
+            )
+            rollup.quantity += row['quantity']
+            rollup.revenue += row['revenue']
+            rollup.order_count += row['order_count']
+
+    with transaction.atomic():
+        DailySales.objects.filter(date__range=(start, end)).delete()
+        DailyItemSales.objects.filter(date__range=(start, end)).delete()
+        DailySales.objects.bulk_create(daily.values(), batch_size=1000)
+        DailyItemSales.objects.bulk_create(daily_items.values(), batch_size=1000)
+    return len(daily), len(daily_items)
+
+
+def sales_report(start, end, top=10):
+    """
+    Summarise the rollups between start and end (inclusive)
+
+    Ranges longer than three months are grouped by month instead of by day.
+    """
+    sales = DailySales.objects.filter(date__range=(start, end))
+    item_sales = DailyItemSales.objects.filter(date__range=(start, end))
+    by_month = (end - start).days > 92
+
+    periods = sales.annotate(period=TruncMonth('date')) if by_month else sales.annotate(period=F('date'))
+    periods = (
+        periods.values('period')
+        .annotate(order_count=Sum('order_count'), revenue=Sum('revenue'))
+        .order_by('period')
+    )
+    order_types = (
+        sales.values('order_type')
+        .annotate(order_count=Sum('order_count'), revenue=Sum('revenue'))
+        .order_by('order_type')
+    )
+    top_items = (
+        item_sales.values('menu_item_id', 'menu_item__name')
+        .annotate(quantity=Sum('quantity'), revenue=Sum('revenue'))
+        .order_by('-revenue')[:top]
+    )
+    totals = sales.aggregate(order_count=Sum('order_count'), revenue=Sum('revenue'))
+
+    return {
+        'by_month': by_month,
+        'periods': list(periods),
+        'order_types': list(order_types),
+        'top_items': list(top_items),
+        'order_count': totals['order_count'] or 0,
+        'revenue': totals['revenue'] or 0,
+    }
@@ -0,0 +1,18 @@
+"""
+Signal Handlers
+Drop cached menu data whenever a menu item is saved or deleted, from the
+admin or anywhere else (shell, scripts). Bulk writes that skip signals
+(menu_sync, image_sync) invalidate explicitly.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .menu_sync import invalidate_menu_caches
+from .models import MenuItem
+
+
+@receiver([post_save, post_delete], sender=MenuItem, dispatch_uid='main.invalidate_menu_caches')
+def menu_item_changed(sender, **kwargs):
+    """Cached rankings and menu cards hold item data, refresh them once the change commits"""
+    transaction.on_commit(invalidate_menu_caches)
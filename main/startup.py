@@ -0,0 +1,176 @@
+"""
+Startup
+Warm-up at boot and cold start measurement for the serverless deployment.
+
+On Vercel every cold start imports Django and the project, and the first
+request also builds the URL resolver (importing the views and everything
+they import), compiles its templates and fills the per-process caches.
+warm_up() does that work at boot, from restaurant_core/wsgi.py when
+WARMUP_ON_BOOT is set, so the first request costs about the same as any
+other. It is off by default: boot plus first request gets slower overall,
+which only pays off where the server boots before traffic arrives.
+
+measure_cold_start() starts a fresh interpreter with -X importtime, loads
+the WSGI application and sends it two requests. It reports the boot time,
+the first and second request latency and where import time goes; the
+profile_startup command prints it and checks STARTUP_TARGET_SECONDS.
+"""
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Runs in the fresh interpreter, argv: path host
+_COLD_START_SCRIPT = '''
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+from restaurant_core.wsgi import application
+boot = time.perf_counter() - started
+
+requests = []
+for _ in range(2):
+    environ = {'PATH_INFO': sys.argv[1], 'HTTP_HOST': sys.argv[2]}
+    setup_testing_defaults(environ)
+    statuses = []
+    started = time.perf_counter()
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    b''.join(response)
+    response.close()
+    requests.append([time.perf_counter() - started, statuses[0]])
+print(json.dumps({'boot': boot, 'requests': requests}))
+'''
+
+
+# ==================== WARM-UP ====================
+
+def build_url_resolver():
+    """Import the URLconf (and with it the views) and fill the reverse lookup, returns the name count"""
+    from django.urls import get_resolver
+
+    return len(get_resolver().reverse_dict)
+
+
+def _project_templates(engine):
+    """Names of the templates in the project's own template directories"""
+    root = str(settings.BASE_DIR)
+    for directory in engine.template_dirs:
+        directory = str(directory)
+        if not directory.startswith(root) or 'site-packages' in directory:
+            continue
+        for path, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith('.html'):
+                    yield os.path.relpath(os.path.join(path, name), directory).replace(os.sep, '/')
+
+
+def compile_templates():
+    """Load every project template so the cached loader holds it compiled, returns the count"""
+    from django.template import engines
+
+    count = 0
+    for engine in engines.all():
+        for name in _project_templates(engine):
+            engine.get_template(name)
+            count += 1
+    return count
+
+
+def warm_up():
+    """
+    Build the URL resolver, compile templates and prime the menu caches
+
+    Never raises: a failed step (e.g. the database is not reachable yet)
+    is logged and the first request does the work instead. Database
+    connections are closed afterwards so workers forked from a preloaded
+    process (gunicorn --preload) don't share the boot connection.
+
+    Returns:
+        dict: Seconds per step
+    """
+    from .rankings import home_rankings
+
+    steps = {
+        'urls': build_url_resolver,
+        'templates': compile_templates,
+        'menu': home_rankings,
+    }
+    timings = {}
+    for name, step in steps.items():
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception('Warm-up step failed', extra={'step': name})
+        timings[name] = round(time.perf_counter() - started, 4)
+    connections.close_all()
+    logger.info('Warm-up done', extra={'seconds': timings})
+    return timings
+
+
+# ==================== MEASUREMENT ====================
+
+def parse_importtime(output):
+    """
+    Self and cumulative microseconds per module from -X importtime output
+
+    Returns:
+        list: (module, self_us, cumulative_us, depth) in import order
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def measure_cold_start(path='/', host='localhost', warm_up_on_boot=None):
+    """
+    Cold start of the WSGI application in a new interpreter
+
+    Args:
+        warm_up_on_boot: Override WARMUP_ON_BOOT for the measured process
+
+    Returns:
+        dict: 'boot', 'first_request', 'second_request' (seconds), 'status', 'modules' (see parse_importtime)
+    """
+    env = dict(os.environ)
+    if warm_up_on_boot is not None:
+        env['WARMUP_ON_BOOT'] = '1' if warm_up_on_boot else '0'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _COLD_START_SCRIPT, path, host],
+        capture_output=True, text=True, cwd=str(settings.BASE_DIR), env=env,
+    )
+    lines = result.stdout.strip().splitlines()
+    if result.returncode or not lines:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        raise RuntimeError('The measured process failed:\n' + '\n'.join(errors[-20:]))
+    timings = json.loads(lines[-1])
+    (first, status), (second, _) = timings['requests']
+    return {
+        'boot': timings['boot'],
+        'first_request': first,
+        'second_request': second,
+        'status': status,
+        'modules': parse_importtime(result.stderr),
+    }
+
+
+def import_time_by_package(modules):
+    """Self import time (seconds) per top-level package, largest first"""
+    totals = {}
+    for name, self_us, _, _ in modules:
+        package = name.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us / 1e6
+    return sorted(totals.items(), key=lambda pair: pair[1], reverse=True)
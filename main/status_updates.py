@@ -0,0 +1,82 @@
+"""
+Bulk Status Updates
+Move many orders/reservations to a new status with a single UPDATE
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .events import order_status_event, publish
+from .models import Order, Reservation
+from .recommendations import record_pairing_status_change
+from .reporting import record_status_change
+from .notifications import (
+    build_order_status_messages,
+    build_reservation_status_messages,
+    send_notification_batch,
+)
+
+RECIPIENT_FIELDS = ['id', 'guest_email', 'guest_name', 'user__email', 'user__username']
+
+
+def bulk_update_order_status(queryset, new_status, notify=True):
+    """
+    Set the status of every order in queryset
+
+    Orders already in new_status are left alone so customers are not
+    notified twice. Notifications are sent as one batch after commit.
+
+    Returns:
+        int: Number of orders updated
+    """
+    status_labels = dict(Order.STATUS_CHOICES)
+    if new_status not in status_labels:
+        raise ValueError(f"Invalid order status: {new_status}")
+
+    with transaction.atomic():
+        rows = list(
+            queryset.exclude(status=new_status).values('order_number', 'status', *RECIPIENT_FIELDS)
+        )
+        if not rows:
+            return 0
+        updated = Order.objects.filter(id__in=[row['id'] for row in rows]).update(
+            status=new_status,
+            updated_at=timezone.now(),
+        )
+        record_status_change(rows, new_status)
+        record_pairing_status_change(rows, new_status)
+        for row in rows:
+            publish(order_status_event(row['id'], row['order_number'], new_status, status_labels[new_status]))
+        if notify:
+            batch = build_order_status_messages(rows, status_labels[new_status])
+            transaction.on_commit(lambda: send_notification_batch(batch))
+    return updated
+
+
+def bulk_update_reservation_status(queryset, new_status, notify=True):
+    """
+    Set the status of every reservation in queryset
+
+    Reservations already in new_status are left alone so guests are not
+    notified twice. Notifications are sent as one batch after commit.
+
+    Returns:
+        int: Number of reservations updated
+    """
+    status_labels = dict(Reservation.STATUS_CHOICES)
+    if new_status not in status_labels:
+        raise ValueError(f"Invalid reservation status: {new_status}")
+
+    with transaction.atomic():
+        rows = list(
+            queryset.exclude(status=new_status).values('reservation_number', *RECIPIENT_FIELDS)
+        )
+        if not rows:
+            return 0
+        updated = Reservation.objects.filter(id__in=[row['id'] for row in rows]).update(
+            status=new_status,
+            updated_at=timezone.now(),
+        )
+        if notify:
+            batch = build_reservation_status_messages(rows, status_labels[new_status])
+            transaction.on_commit(lambda: send_notification_batch(batch))
+    return updated
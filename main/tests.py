@@ -1,3 +1,501 @@
-from django.test import TestCase
+"""
+Tests for main
 
-# Create your tests here.
+QueryBudgetTests request every route in main/urls.py against a small data
+set and again after adding several times more rows. The number of queries
+must stay within the route's budget and must not grow with the data (an
+N+1 shows up as a difference between the two runs). Failures list every
+query with the project code that issued it.
+
+The other test cases cover behaviour: N+1 detection, instrumentation under
+ASGI, identifiers, sales rollups, the archive and bulk status updates.
+"""
+import io
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.http import Http404
+from django.template import Context, Template
+from django.test import AsyncClient, Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import identifiers, metrics, nplusone
+from .archive import archive_order_ids, archive_orders, get_order_or_archived, recent_orders_for
+from .fake_data import FakeDataGenerator
+from .models import ArchivedOrder, ArchivedOrderItem, DailyItemSales, DailySales, MenuItem, Order, OrderItem, Reservation
+from .nplusone import QueryTracker
+from .order_history import order_history_page
+from .profiling import load_report, project_stack
+from .reporting import first_order_date, rebuild_rollups, record_orders
+from .status_updates import bulk_update_order_status
+from .urls import urlpatterns
+
+LATENCY_BUDGET = 1.0  # Seconds, coarse: catches accidental full-table work, not regressions of a few ms
+
+
+@dataclass
+class Route:
+    budget: int
+    method: str = 'GET'
+    user: str = ''  # '', 'customer' or 'staff'
+    args: Callable = lambda case: []
+    data: Callable = lambda case: {}
+    basket: bool = False
+    headers: dict = field(default_factory=dict)
+
+
+# Budgets count everything a request runs, including the session read/write,
+# loading request.user, savepoints and the configured cache backend (the
+# database cache by default), measured with a cold cache: a cache write costs
+# five queries there (cull count, savepoint, lookup, insert, release), a read
+# one. Lower a budget when a view gets cheaper.
+ROUTES = {
+    'home': Route(23),
+    'about': Route(1),
+    'locations': Route(1),
+    'menu': Route(14),
+    'menu_detail': Route(3, args=lambda case: [case.item.id]),
+    'signup': Route(1),
+    'login': Route(1),
+    'logout': Route(4, user='customer'),
+    'profile': Route(10, user='customer'),
+    'order_history': Route(14, user='customer'),
+    'basket': Route(7, basket=True),
+    'add_to_basket': Route(
+        5, 'POST', args=lambda case: [case.item.id], data=lambda case: {'quantity': 1},
+        headers={'X-Requested-With': 'XMLHttpRequest'},
+    ),
+    'update_basket': Route(
+        8, 'POST', args=lambda case: [case.item.id], data=lambda case: {'quantity': 2}, basket=True,
+        headers={'X-Requested-With': 'XMLHttpRequest'},
+    ),
+    'remove_from_basket': Route(
+        6, 'POST', args=lambda case: [case.item.id], basket=True,
+        headers={'X-Requested-With': 'XMLHttpRequest'},
+    ),
+    'checkout': Route(6, basket=True),
+    'process_payment': Route(
+        32, 'POST', basket=True,
+        data=lambda case: {'order_type': 'delivery', 'delivery_address': '1 High Street',
+                           'guest_name': 'Guest', 'guest_email': 'guest@example.com'},
+    ),
+    'order_confirmation': Route(8, user='customer', args=lambda case: [case.order.order_number]),
+    'track_order': Route(1, data=lambda case: {'order_number': case.guest_order.order_number,
+                                                'email': case.guest_order.guest_email}),
+    'make_reservation': Route(
+        4, 'POST',
+        data=lambda case: {'date': (timezone.localdate() + timedelta(days=400)).isoformat(),
+                           'time': '18:00', 'guests': 2, 'guest_email': 'guest@example.com'},
+    ),
+    'reservation_confirmation': Route(3, args=lambda case: [case.reservation.reservation_number]),
+    'my_reservations': Route(6, user='customer'),
+    'admin_dashboard': Route(11, user='staff'),
+    'admin_orders': Route(6, user='staff'),
+    'admin_order_detail': Route(7, user='staff', args=lambda case: [case.order.id]),
+    'admin_update_order_status': Route(
+        8, 'POST', user='staff', args=lambda case: [case.order.id], data=lambda case: {'status': 'ready'},
+    ),
+    'admin_prep_queue': Route(6, user='staff'),
+    'admin_prep_forecast': Route(8, user='staff'),
+    'admin_occupancy': Route(12, user='staff'),
+    'admin_sales_report': Route(9, user='staff'),
+    'metrics': Route(5, user='staff'),
+    'admin_profiles': Route(5, user='staff'),
+    'admin_profile_detail': Route(5, user='staff', args=lambda case: ['MISSING']),
+    'admin_export': Route(7, user='staff', args=lambda case: ['order_items']),
+    'admin_bulk_update_orders': Route(
+        10, 'POST', user='staff',
+        data=lambda case: {'status': 'completed', 'order_ids': case.open_order_ids},
+    ),
+    'admin_reservations': Route(6, user='staff'),
+    'admin_update_reservation_status': Route(
+        8, 'POST', user='staff', args=lambda case: [case.reservation.id], data=lambda case: {'status': 'completed'},
+    ),
+    'admin_bulk_update_reservations': Route(
+        10, 'POST', user='staff',
+        data=lambda case: {'status': 'cancelled', 'reservation_ids': case.future_reservation_ids},
+    ),
+}
+
+# Routes that can't be measured as a single request
+EXCLUDED = {
+    'kitchen_feed': 'Server-sent event stream that never ends',
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+@override_settings(
+    WEB3FORMS_ACCESS_KEY=None,
+    PROFILER_SAMPLE_RATE=0,
+    NPLUSONE_SAMPLE_RATE=0,
+    METRICS_MULTIPROCESS_DIR='',
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'password', is_staff=True)
+        cls.customer = User.objects.create_user('customer', 'customer@example.com', 'password')
+        generator = FakeDataGenerator(seed=1)
+        generator.menu(8)
+        # The customer is the only non-staff user, so every non-guest order is theirs
+        generator.orders(12, days=14)
+        generator.reservations(12, days=14, future_days=14)
+
+    def setUp(self):
+        self.item = MenuItem.objects.filter(is_available=True).order_by('id').first()
+        self.order = Order.objects.filter(user=self.customer).order_by('id').first()
+        self.guest_order = Order.objects.filter(user=None).order_by('id').first()
+        self.reservation = Reservation.objects.order_by('id').first()
+
+    def grow(self, factor=5):
+        """Add factor times the rows of the small data set"""
+        generator = FakeDataGenerator(seed=2)
+        generator.menu(8 * factor)
+        generator.users(3 * factor)
+        generator.orders(12 * factor, days=14)
+        generator.reservations(12 * factor, days=14, future_days=14)
+
+    @property
+    def open_order_ids(self):
+        return list(Order.objects.exclude(status__in=['completed', 'cancelled']).values_list('id', flat=True))
+
+    @property
+    def future_reservation_ids(self):
+        return list(
+            Reservation.objects.filter(date__gte=timezone.localdate()).values_list('id', flat=True)
+        )
+
+    def measure(self, name):
+        """Request a route in a rolled back transaction, returns (queries, seconds, status)"""
+        route = ROUTES[name]
+        cache.clear()
+        client = Client()
+        if route.user:
+            client.force_login(getattr(self, route.user))
+        if route.basket:
+            session = client.session
+            session['basket'] = {str(item_id): 1 for item_id in MenuItem.objects.values_list('id', flat=True)[:2]}
+            session.save()
+        url = reverse(f'main:{name}', args=route.args(self))
+
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            queries.append((sql, project_stack()))
+            return execute(sql, params, many, context)
+
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                with connection.execute_wrapper(record):
+                    request = client.post if route.method == 'POST' else client.get
+                    response = request(url, route.data(self), headers=route.headers)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                elapsed = time.perf_counter() - started
+                raise _Rollback
+        except _Rollback:
+            pass
+        return queries, elapsed, response.status_code
+
+    def describe(self, queries):
+        return '\n'.join(
+            f'{index}. {sql}\n   ' + ' <- '.join(reversed([frame for frame in stack if 'main/tests.py' not in frame]))
+            for index, (sql, stack) in enumerate(queries, 1)
+        )
+
+    def test_every_route_has_a_budget(self):
+        names = {pattern.name for pattern in urlpatterns}
+        missing = names - set(ROUTES) - set(EXCLUDED)
+        self.assertFalse(missing, f'Add a query budget to ROUTES for: {", ".join(sorted(missing))}')
+
+    def test_query_budgets(self):
+        small = {name: self.measure(name) for name in ROUTES}
+        self.grow()
+        large = {name: self.measure(name) for name in ROUTES}
+
+        for name, route in ROUTES.items():
+            with self.subTest(route=name):
+                small_queries, _, status = small[name]
+                large_queries, elapsed, _ = large[name]
+                self.assertLess(status, 500, f'{name} failed with {status}')
+                self.assertLessEqual(
+                    len(large_queries), route.budget,
+                    f'{name} ran {len(large_queries)} queries, budget {route.budget}:\n{self.describe(large_queries)}',
+                )
+                self.assertLessEqual(
+                    len(large_queries), len(small_queries),
+                    f'{name} ran {len(small_queries)} queries on the small data set and {len(large_queries)} '
+                    f'with more rows (N+1?):\n{self.describe(large_queries)}',
+                )
+                self.assertLess(elapsed, LATENCY_BUDGET, f'{name} took {elapsed:.3f}s')
+
+
+class NPlusOneTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generator = FakeDataGenerator(seed=1)
+        generator.menu(6)
+        generator.users(3)
+        generator.orders(6, days=7, guest_share=0)
+
+    def test_repeated_query_in_code(self):
+        with QueryTracker() as tracker:
+            for item_id in MenuItem.objects.values_list('id', flat=True):
+                MenuItem.objects.get(id=item_id)
+        offenders = tracker.offenders(threshold=5)
+        self.assertEqual(len(offenders), 1)
+        self.assertEqual(offenders[0]['count'], 6)
+        self.assertIn('FROM "main_menuitem" WHERE "main_menuitem"."id" = %s', offenders[0]['sql'])
+        self.assertTrue(offenders[0]['origins'][0].startswith('main/tests.py:'))
+
+    def test_repeated_query_in_template(self):
+        template = Template('{% for order in orders %}\n{{ order.user.username }}{% endfor %}')
+        with QueryTracker() as tracker:
+            template.render(Context({'orders': Order.objects.all()}))
+        offenders = tracker.offenders(threshold=5)
+        self.assertEqual(len(offenders), 1)
+        self.assertEqual(offenders[0]['origins'], ['<unknown source>:2'])
+
+    def test_in_lists_are_one_query_shape(self):
+        with QueryTracker() as tracker:
+            for size in range(1, 6):
+                list(MenuItem.objects.filter(id__in=range(size + 1)))
+        self.assertEqual(tracker.offenders(threshold=5)[0]['count'], 5)
+
+
+class SalesRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generator = FakeDataGenerator(seed=3)
+        generator.menu(6)
+        generator.users(3)
+        generator.orders(30, days=60)
+
+    def rollups(self):
+        # Cancelling every order of a day leaves a zeroed row that a rebuild skips
+        return (
+            sorted(DailySales.objects.filter(order_count__gt=0).values_list('date', 'order_type', 'order_count', 'revenue')),
+            sorted(
+                DailyItemSales.objects.filter(order_count__gt=0)
+                .values_list('date', 'menu_item_id', 'quantity', 'revenue', 'order_count')
+            ),
+        )
+
+    def test_incremental_rollups_match_rebuild(self):
+        record_orders(list(Order.objects.exclude(status='cancelled').values_list('id', flat=True)))
+        completed = list(Order.objects.filter(status='completed').order_by('id').values_list('id', flat=True))
+        bulk_update_order_status(Order.objects.filter(id__in=completed[:5]), 'cancelled', notify=False)
+        cancelled = list(Order.objects.filter(status='cancelled').order_by('id').values_list('id', flat=True))
+        bulk_update_order_status(Order.objects.filter(id__in=cancelled[-2:]), 'completed', notify=False)
+        incremental = self.rollups()
+
+        rebuild_rollups(first_order_date(), timezone.localdate())
+        self.assertEqual(incremental, self.rollups())
+        self.assertTrue(incremental[0])
+
+    def test_rebuild_all_history_includes_archived_orders(self):
+        oldest = Order.objects.order_by('created_at').first()
+        finished = Order.objects.filter(status__in=['completed', 'cancelled']).order_by('created_at')
+        archive_order_ids(list(finished.values_list('id', flat=True)[:10]))
+        self.assertTrue(ArchivedOrder.objects.filter(id=oldest.id).exists())
+
+        out = io.StringIO()
+        call_command('rebuild_sales_rollups', stdout=out)
+        self.assertIn(f'Rebuilt {timezone.localdate(oldest.created_at)} to', out.getvalue())
+        sold = sum(model.objects.exclude(status='cancelled').count() for model in (Order, ArchivedOrder))
+        self.assertEqual(DailySales.objects.aggregate(total=Sum('order_count'))['total'], sold)
+
+
+
+@override_settings(ARCHIVE_ORDERS_AFTER_DAYS=90)
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generator = FakeDataGenerator(seed=4)
+        generator.menu(6)
+        generator.users(2)
+        generator.orders(40, days=400, guest_share=0)
+        cls.user = User.objects.annotate(n=Count('orders')).order_by('-n').first()
+        cls.newest_first = list(
+            Order.objects.filter(user=cls.user).order_by('-created_at', '-pk').values_list('order_number', flat=True)
+        )
+
+    def test_archive_moves_old_final_orders_only(self):
+        cutoff = timezone.now() - timedelta(days=90)
+        due = set(
+            Order.objects.filter(status__in=['completed', 'cancelled'], created_at__lt=cutoff).values_list('id', flat=True)
+        )
+        lines = OrderItem.objects.filter(order_id__in=due).count()
+        self.assertTrue(due)
+        self.assertEqual(archive_orders(chunk_size=7), len(due))
+        self.assertEqual(set(ArchivedOrder.objects.values_list('id', flat=True)), due)
+        self.assertEqual(ArchivedOrderItem.objects.count(), lines)
+        self.assertFalse(Order.objects.filter(id__in=due).exists())
+        self.assertFalse(OrderItem.objects.filter(order_id__in=due).exists())
+
+    def test_history_spans_live_and_archived_orders(self):
+        archive_orders()
+        archived = ArchivedOrder.objects.filter(user=self.user).first()
+        self.assertIsNotNone(archived)
+
+        seen, cursor = [], None
+        while True:
+            orders, cursor = order_history_page(self.user, cursor, per_page=3)
+            seen += [order.order_number for order in orders]
+            if cursor is None:
+                break
+        self.assertEqual(seen, self.newest_first)
+        recent = recent_orders_for(self.user, len(self.newest_first))
+        self.assertEqual({order.order_number for order in recent}, set(self.newest_first))
+        self.assertIsInstance(get_order_or_archived(order_number=archived.order_number), ArchivedOrder)
+        with self.assertRaises(Http404):
+            get_order_or_archived(order_number='missing')
+
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse('main:order_history'))
+        self.assertContains(response, self.newest_first[0])
+
+
+
+class BulkStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'password', is_staff=True)
+        generator = FakeDataGenerator(seed=5)
+        generator.menu(6)
+        generator.users(3)
+        generator.orders(12, days=7)
+        generator.reservations(8, days=7, future_days=7)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def test_orders_already_in_the_status_are_skipped(self):
+        Order.objects.filter(id__in=Order.objects.order_by('id').values('id')[:3]).update(status='ready')
+        ids = list(Order.objects.order_by('id').values_list('id', flat=True)[:6])
+        with self.captureOnCommitCallbacks(execute=True):
+            updated = bulk_update_order_status(Order.objects.filter(id__in=ids), 'ready')
+        self.assertEqual(updated, 3)
+        self.assertEqual(Order.objects.filter(id__in=ids, status='ready').count(), 6)
+        self.assertEqual(len(mail.outbox), 3)
+        with self.assertRaises(ValueError):
+            bulk_update_order_status(Order.objects.filter(id__in=ids), 'lost')
+
+    def test_bulk_order_view_keeps_the_filter(self):
+        ids = list(Order.objects.exclude(status='ready').values_list('id', flat=True)[:4])
+        response = self.client.post(
+            reverse('main:admin_bulk_update_orders'),
+            {'order_ids': ids, 'status': 'ready', 'status_filter': 'pending'},
+        )
+        self.assertRedirects(response, f"{reverse('main:admin_orders')}?status=pending", fetch_redirect_response=False)
+        self.assertEqual(Order.objects.filter(id__in=ids, status='ready').count(), len(ids))
+
+        response = self.client.post(reverse('main:admin_bulk_update_orders'), {'order_ids': ids, 'status': 'lost'})
+        self.assertRedirects(response, reverse('main:admin_orders'), fetch_redirect_response=False)
+
+    def test_bulk_reservation_view_updates_and_keeps_filters(self):
+        ids = list(Reservation.objects.exclude(status='confirmed').values_list('id', flat=True)[:3])
+        response = self.client.post(
+            reverse('main:admin_bulk_update_reservations'),
+            {'reservation_ids': ids, 'status': 'confirmed', 'status_filter': 'pending', 'date_filter': '2026-01-02'},
+        )
+        self.assertRedirects(
+            response,
+            f"{reverse('main:admin_reservations')}?status=pending&date=2026-01-02",
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(Reservation.objects.filter(id__in=ids, status='confirmed').count(), len(ids))
+
+
+# Without the sync-only WhiteNoise, so the chain stays async where Django allows it
+ASYNC_MIDDLEWARE = [
+    'main.middleware.MetricsMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'main.middleware.ProfilerMiddleware',
+    'main.middleware.NPlusOneMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+]
+
+
+@override_settings(
+    METRICS_MULTIPROCESS_DIR='',
+    MIDDLEWARE=ASYNC_MIDDLEWARE,
+    PROFILER_DIR=tempfile.mkdtemp(prefix='profiles-test-'),
+    PROFILER_SAMPLE_RATE=0,
+    NPLUSONE_SAMPLE_RATE=0,
+)
+class AsgiInstrumentationTests(TestCase):
+    """The instrumentation middleware must see the queries of sync views served through ASGI"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'password', is_staff=True)
+        FakeDataGenerator(seed=1).menu(4)
+
+    def counter(self, name, view):
+        return metrics.registry.counters.get((name, (('view', view),)), 0)
+
+    async def test_metrics_count_queries(self):
+        before = self.counter('db_queries_total', 'main:menu')
+        response = await AsyncClient().get(reverse('main:menu'))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(self.counter('db_queries_total', 'main:menu'), before)
+
+    async def test_profiler_profiles_sync_views(self):
+        client = AsyncClient()
+        await client.aforce_login(self.staff)
+        response = await client.get(reverse('main:menu'), {'profile': '1', 'email': 'guest@example.com'})
+        self.assertEqual(response.status_code, 200)
+        report_id = response.headers['X-Profile-Report'].rstrip('/').rsplit('/', 1)[-1]
+        report = load_report(report_id)
+        self.assertEqual(report['view'], 'main:menu')
+        self.assertEqual(report['path'], reverse('main:menu'))
+        self.assertGreater(report['query_count'], 0)
+
+    async def test_nplusone_tracks_sync_views(self):
+        with override_settings(NPLUSONE_SAMPLE_RATE=1, NPLUSONE_THRESHOLD=1), \
+                mock.patch.object(nplusone, 'report') as report:
+            response = await AsyncClient().get(reverse('main:menu'))
+        self.assertEqual(response.status_code, 200)
+        report.assert_called_once()
+
+
+class IdentifierTests(SimpleTestCase):
+    def test_format(self):
+        identifier = identifiers.new_identifier()
+        self.assertEqual(len(identifier), 16)
+        self.assertTrue(set(identifier) <= set(identifiers.ALPHABET))
+
+    def test_monotonic_within_a_millisecond(self):
+        with mock.patch('main.identifiers.time.time_ns', return_value=1_800_000_000_000 * 1_000_000):
+            numbers = [identifiers.new_identifier() for _ in range(1000)]
+        self.assertEqual(numbers, sorted(numbers))
+        self.assertEqual(len(set(numbers)), len(numbers))
+        # The first 9 characters hold only timestamp bits
+        self.assertEqual({number[:9] for number in numbers}, {numbers[0][:9]})
+
+    def test_later_identifiers_sort_after_earlier_ones(self):
+        earlier = identifiers.identifier_at(timezone.now() - timedelta(seconds=1), 2 ** 32 - 1)
+        self.assertLess(earlier, identifiers.new_identifier())
+
+    def test_unique(self):
+        numbers = [identifiers.new_identifier() for _ in range(10000)]
+        self.assertEqual(len(set(numbers)), len(numbers))
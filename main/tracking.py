@@ -0,0 +1,50 @@
+"""
+Guest Order Tracking
+Status lookups for guest orders by order number and email.
+
+A lookup reads a handful of columns in one indexed query (the archive is
+only tried when the live table has no match). Responses are cacheable for
+a time that depends on the status: active orders change within minutes,
+finished ones never change again.
+"""
+from .models import ArchivedOrder, Order
+
+FINISHED_STATUSES = ('delivered', 'completed', 'cancelled')
+ACTIVE_MAX_AGE = 15
+FINISHED_MAX_AGE = 60 * 60 * 24
+TRACKING_FIELDS = ['order_number', 'order_type', 'status', 'collection_time', 'updated_at']
+
+
+def normalize_email(email):
+    """Guest emails are stored and looked up lowercased so lookups can use the index"""
+    return (email or '').strip().lower()
+
+
+def guest_order_status(order_number, email):
+    """
+    Compact status of a guest order
+
+    Returns:
+        dict or None: None when no guest order matches both the number and the email
+    """
+    lookup = {'order_number': order_number.strip().upper(), 'guest_email': normalize_email(email)}
+    for model in (Order, ArchivedOrder):
+        row = model.objects.filter(**lookup).values(*TRACKING_FIELDS).first()
+        if row is not None:
+            break
+    else:
+        return None
+
+    return {
+        'order_number': row['order_number'],
+        'order_type': row['order_type'],
+        'status': row['status'],
+        'status_display': dict(Order.STATUS_CHOICES).get(row['status'], row['status']),
+        'collection_time': row['collection_time'].isoformat() if row['collection_time'] else None,
+        'updated_at': row['updated_at'].isoformat(),
+    }
+
+
+def status_max_age(status):
+    """Seconds a tracking response for an order in this status may be cached"""
+    return FINISHED_MAX_AGE if status in FINISHED_STATUSES else ACTIVE_MAX_AGE
@@ -18,6 +18,7 @@ urlpatterns = [
     path('login/', views.user_login, name='login'),
     path('logout/', views.user_logout, name='logout'),
     path('profile/', views.profile, name='profile'),
+    path('order-history/', views.order_history, name='order_history'),
     
     # Ordering system
     path('basket/', views.basket, name='basket'),
@@ -27,6 +28,7 @@ urlpatterns = [
     path('checkout/', views.checkout, name='checkout'),
     path('process-payment/', views.process_payment, name='process_payment'),
     path('order-confirmation/<str:order_number>/', views.order_confirmation, name='order_confirmation'),
+    path('track-order/', views.track_order, name='track_order'),
     
     # Reservations
     path('reservations/', views.make_reservation, name='make_reservation'),
@@ -38,6 +40,17 @@ urlpatterns = [
     path('admin-orders/', views.admin_orders, name='admin_orders'),
     path('admin-order/<int:order_id>/', views.admin_order_detail, name='admin_order_detail'),
     path('admin-update-order-status/<int:order_id>/', views.admin_update_order_status, name='admin_update_order_status'),
+    path('admin-prep-queue/', views.admin_prep_queue, name='admin_prep_queue'),
+    path('admin-prep-forecast/', views.admin_prep_forecast, name='admin_prep_forecast'),
+    path('admin-occupancy/', views.admin_occupancy, name='admin_occupancy'),
+    path('admin-sales-report/', views.admin_sales_report, name='admin_sales_report'),
+    path('metrics', views.metrics, name='metrics'),
+    path('admin-profiles/', views.admin_profiles, name='admin_profiles'),
+    path('admin-profiles/<str:report_id>/', views.admin_profile_detail, name='admin_profile_detail'),
+    path('admin-export/<str:kind>/', views.admin_export, name='admin_export'),
+    path('admin-orders/feed/', views.kitchen_feed, name='kitchen_feed'),
+    path('admin-orders/bulk-update/', views.admin_bulk_update_orders, name='admin_bulk_update_orders'),
     path('admin-reservations/', views.admin_reservations, name='admin_reservations'),
     path('admin-update-reservation/<int:reservation_id>/', views.admin_update_reservation_status, name='admin_update_reservation_status'),
+    path('admin-reservations/bulk-update/', views.admin_bulk_update_reservations, name='admin_bulk_update_reservations'),
 ]
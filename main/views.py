@@ -5,26 +5,46 @@ from django.contrib.auth.models import User
 from django.contrib import messages
 from django.core.mail import send_mail
 from django.conf import settings
-from django.http import JsonResponse
-from django.db.models import Q, Sum
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.db.models import Count, Q, Sum
 from django.utils import timezone
+from django.utils.http import urlencode
 from decimal import Decimal
 from datetime import datetime, timedelta
 import json
+import logging
 
 from .models import MenuItem, Order, OrderItem, Reservation, UserProfile
 from .web3forms import send_order_confirmation, send_reservation_confirmation, send_admin_notification
+from .archive import get_order_or_archived, recent_orders_for
+from .metrics import collect, render_prometheus
+from .profiling import list_reports, load_report
+from .tracking import ACTIVE_MAX_AGE, guest_order_status, normalize_email, status_max_age
+from .order_history import order_history_page, order_receipts, prefetch_order_lines
+from .events import format_sse, get_broker, order_event, publish
+from .prep_queue import prep_queue
+from .forecasting import prep_sheet
+from .occupancy import METRICS, heatmap_rows, occupancy_matrix
+from .exports import EXPORTS, FORMATS, stream_export
+from .menu_cards import HOME_CARD, menu_cards
+from .rankings import home_rankings
+from .recommendations import pairs_well_with, record_order_pairings, record_pairing_status_change
+from .reporting import record_orders, record_status_change, sales_report
+from .status_updates import bulk_update_order_status, bulk_update_reservation_status
+
+logger = logging.getLogger(__name__)
 
 
 # ==================== PUBLIC PAGES ====================
 
 def home(request):
     """Homepage with featured items"""
-    featured_items = MenuItem.objects.filter(is_available=True)[:6]
-    menu_items = MenuItem.objects.filter(is_available=True)[:8]  # For the Webfoutend section
+    rankings = home_rankings()
     context = {
-        'featured_items': featured_items,
-        'menu_items': menu_items,
+        'featured_items': rankings['featured'],  # Trending, weighted by recency
+        'menu_cards': menu_cards(request, rankings['popular'][:8], HOME_CARD),  # Best sellers for the Webfoutend section
     }
     return render(request, 'main/home.html', context)
 
@@ -47,11 +67,13 @@ def menu(request):
         items = MenuItem.objects.filter(category=category, is_available=True)
     else:
         items = MenuItem.objects.filter(is_available=True)
+    items = list(items)
     
     categories = MenuItem.CATEGORY_CHOICES
     
     context = {
         'items': items,
+        'cards': menu_cards(request, items),
         'categories': categories,
         'selected_category': category,
     }
@@ -63,6 +85,7 @@ def menu_detail(request, item_id):
     item = get_object_or_404(MenuItem, id=item_id)
     context = {
         'item': item,
+        'pairings': pairs_well_with([item.id]),
     }
     return render(request, 'main/menu_detail.html', context)
 
@@ -113,10 +136,9 @@ def signup(request):
                 f'Hi {username},\n\nThank you for signing up! Your account has been created successfully.',
                 settings.DEFAULT_FROM_EMAIL,
                 [email],
-                fail_silently=True,
             )
-        except:
-            pass
+        except Exception:
+            logger.exception('Welcome email failed', extra={'username': username})
         
         messages.success(request, 'Account created successfully! Please log in.')
         return redirect('main:login')
@@ -167,8 +189,8 @@ def profile(request):
         messages.success(request, 'Profile updated successfully!')
         return redirect('main:profile')
     
-    # Get user's recent orders
-    recent_orders = Order.objects.filter(user=request.user)[:5]
+    # Get user's recent orders (including archived ones)
+    recent_orders = recent_orders_for(request.user, 5)
     
     context = {
         'profile': profile,
@@ -177,6 +199,20 @@ def profile(request):
     return render(request, 'main/profile.html', context)
 
 
+@login_required
+def order_history(request):
+    """Full order history, paginated by cursor"""
+    cursor = request.GET.get('after')
+    orders, next_cursor = order_history_page(request.user, cursor)
+    
+    context = {
+        'receipts': order_receipts(orders),
+        'next_cursor': next_cursor,
+        'is_paginated': bool(cursor),
+    }
+    return render(request, 'main/order_history.html', context)
+
+
 # ==================== BASKET / CART ====================
 
 def get_basket(request):
@@ -213,6 +249,7 @@ def basket(request):
     context = {
         'basket_items': basket_items,
         'total': total,
+        'pairings': pairs_well_with(entry['item'].id for entry in basket_items),
     }
     return render(request, 'main/basket.html', context)
 
@@ -389,7 +426,7 @@ def process_payment(request):
         
         # Get guest information
         guest_name = request.POST.get('guest_name', '')
-        guest_email = request.POST.get('guest_email', '')
+        guest_email = normalize_email(request.POST.get('guest_email', ''))
         guest_phone = request.POST.get('guest_phone', '')
         
         # Calculate totals
@@ -422,18 +459,24 @@ def process_payment(request):
         )
         
         # Create order items
+        order_items = []
         for item_id, quantity in basket.items():
             try:
                 menu_item = MenuItem.objects.get(id=int(item_id))
-                OrderItem.objects.create(
+                order_items.append(OrderItem.objects.create(
                     order=order,
                     menu_item=menu_item,
                     quantity=quantity,
                     price=menu_item.price
-                )
+                ))
             except MenuItem.DoesNotExist:
                 pass
         
+        # Update sales rollups and recommendations, notify kitchen screens
+        record_orders([order.id])
+        record_order_pairings(order_item.menu_item_id for order_item in order_items)
+        publish(order_event('order_created', order, order_items))
+        
         # Clear basket
         request.session['basket'] = {}
         request.session.modified = True
@@ -456,9 +499,9 @@ Order Type: {order.get_order_type_display()}
 Total: £{order.total}
 """
                 send_admin_notification(web3forms_key, admin_email, "Order", details)
-            except Exception as e:
+            except Exception:
                 # Log error but don't fail the order
-                print(f"Email notification error: {e}")
+                logger.exception('Order notification failed', extra={'order_number': order.order_number})
         
         messages.success(request, 'Order placed successfully!')
         return redirect('main:order_confirmation', order_number=order.order_number)
@@ -468,7 +511,8 @@ Total: £{order.total}
 
 def order_confirmation(request, order_number):
     """Order confirmation page"""
-    order = get_object_or_404(Order, order_number=order_number)
+    order = get_order_or_archived(order_number=order_number)
+    prefetch_order_lines([order])
     # Allow access for both authenticated users and guests
     if request.user.is_authenticated and order.user != request.user:
         messages.error(request, 'Access denied!')
@@ -479,6 +523,30 @@ def order_confirmation(request, order_number):
     return render(request, 'main/order_confirmation.html', context)
 
 
+def track_order(request):
+    """Guest order status as JSON, looked up by order number and email"""
+    order_number = request.GET.get('order_number', '')
+    email = request.GET.get('email', '')
+    if not order_number or not email:
+        return JsonResponse({
+            'success': False,
+            'error': 'Order number and email are required'
+        }, status=400)
+    
+    status = guest_order_status(order_number, email)
+    if status is None:
+        response = JsonResponse({
+            'success': False,
+            'error': 'Order not found'
+        }, status=404)
+        patch_cache_control(response, private=True, max_age=ACTIVE_MAX_AGE)
+        return response
+    
+    response = JsonResponse({'success': True, 'order': status})
+    patch_cache_control(response, private=True, max_age=status_max_age(status['status']))
+    return response
+
+
 # ==================== RESERVATIONS ====================
 
 def make_reservation(request):
@@ -491,7 +559,7 @@ def make_reservation(request):
         
         # Get guest information
         guest_name = request.POST.get('guest_name', '')
-        guest_email = request.POST.get('guest_email', '')
+        guest_email = normalize_email(request.POST.get('guest_email', ''))
         guest_phone = request.POST.get('guest_phone', '')
         
         # Parse date and time
@@ -540,9 +608,11 @@ Number of Guests: {guests}
 Special Requests: {special_requests if special_requests else 'None'}
 """
                 send_admin_notification(web3forms_key, admin_email, "Reservation", details)
-            except Exception as e:
+            except Exception:
                 # Log error but don't fail the reservation
-                print(f"Email notification error: {e}")
+                logger.exception(
+                    'Reservation notification failed', extra={'reservation_number': reservation.reservation_number},
+                )
         
         messages.success(request, 'Reservation confirmed!')
         return redirect('main:reservation_confirmation', reservation_number=reservation.reservation_number)
@@ -594,8 +664,8 @@ def admin_dashboard(request):
     ).count()
     
     # Recent activity
-    recent_orders = Order.objects.all()[:10]
-    recent_reservations = Reservation.objects.all()[:10]
+    recent_orders = Order.objects.select_related('user')[:10]
+    recent_reservations = Reservation.objects.select_related('user')[:10]
     
     context = {
         'total_orders': total_orders,
@@ -604,6 +674,7 @@ def admin_dashboard(request):
         'upcoming_reservations': upcoming_reservations,
         'recent_orders': recent_orders,
         'recent_reservations': recent_reservations,
+        'kitchen_feed_enabled': settings.KITCHEN_FEED_ENABLED,
     }
     return render(request, 'main/admin/dashboard.html', context)
 
@@ -614,10 +685,9 @@ def admin_orders(request):
     """View all orders"""
     status_filter = request.GET.get('status', '')
     
+    orders = Order.objects.select_related('user').annotate(item_count=Count('items'))
     if status_filter:
-        orders = Order.objects.filter(status=status_filter)
-    else:
-        orders = Order.objects.all()
+        orders = orders.filter(status=status_filter)
     
     context = {
         'orders': orders,
@@ -631,7 +701,8 @@ def admin_orders(request):
 @user_passes_test(is_staff)
 def admin_order_detail(request, order_id):
     """View order details"""
-    order = get_object_or_404(Order, id=order_id)
+    order = get_object_or_404(Order.objects.select_related('user'), id=order_id)
+    prefetch_order_lines([order])
     context = {
         'order': order,
         'status_choices': Order.STATUS_CHOICES,
@@ -646,9 +717,13 @@ def admin_update_order_status(request, order_id):
     if request.method == 'POST':
         order = get_object_or_404(Order, id=order_id)
         new_status = request.POST.get('status')
+        old_status = order.status
         
         order.status = new_status
         order.save()
+        record_status_change([{'id': order.id, 'status': old_status}], new_status)
+        record_pairing_status_change([{'id': order.id, 'status': old_status}], new_status)
+        publish(order_event('order_status', order))
         
         # Send email notification
         user_email = order.guest_email if order.guest_email else (order.user.email if order.user else None)
@@ -661,16 +736,236 @@ def admin_update_order_status(request, order_id):
                     f'Hi {user_name},\n\nYour order status has been updated to: {order.get_status_display()}\n\nOrder Number: {order.order_number}',
                     settings.DEFAULT_FROM_EMAIL,
                     [user_email],
-                    fail_silently=True,
                 )
-            except:
-                pass
+            except Exception:
+                logger.exception('Order status email failed', extra={'order_number': order.order_number})
         
         messages.success(request, 'Order status updated successfully!')
     
     return redirect('main:admin_order_detail', order_id=order_id)
 
 
+@login_required
+@user_passes_test(is_staff)
+def admin_prep_queue(request):
+    """What the kitchen has to cook, open order lines grouped by dish"""
+    dishes = prep_queue.dishes()
+    context = {
+        'dishes': dishes,
+        'total_items': sum(dish['quantity'] for dish in dishes),
+        'kitchen_feed_enabled': settings.KITCHEN_FEED_ENABLED,
+        'refresh_seconds': settings.PREP_QUEUE_REFRESH_SECONDS,
+    }
+    return render(request, 'main/admin/prep_queue.html', context)
+
+
+@login_required
+@user_passes_test(is_staff)
+def admin_sales_report(request):
+    """Sales report for a date range, read from the daily rollups"""
+    today = timezone.now().date()
+    try:
+        start = datetime.strptime(request.GET.get('start', ''), '%Y-%m-%d').date()
+    except ValueError:
+        start = today - timedelta(days=29)
+    try:
+        end = datetime.strptime(request.GET.get('end', ''), '%Y-%m-%d').date()
+    except ValueError:
+        end = today
+    if start > end:
+        start, end = end, start
+    
+    context = {
+        'report': sales_report(start, end),
+        'start': start,
+        'end': end,
+    }
+    return render(request, 'main/admin/sales_report.html', context)
+
+
+@login_required
+@user_passes_test(is_staff)
+def admin_prep_forecast(request):
+    """Forecast of how much of each dish to prepare for a day (default: tomorrow)"""
+    try:
+        day = datetime.strptime(request.GET.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        day = timezone.now().date() + timedelta(days=1)
+    
+    try:
+        sheet = prep_sheet(day)
+    except RuntimeError as e:
+        messages.error(request, str(e))
+        sheet = []
+    
+    context = {
+        'sheet': sheet,
+        'day': day,
+    }
+    return render(request, 'main/admin/prep_forecast.html', context)
+
+
+@login_required
+@user_passes_test(is_staff)
+def admin_occupancy(request):
+    """Reservation heatmap by weekday and time slot, with no-show rate"""
+    today = timezone.now().date()
+    try:
+        start = datetime.strptime(request.GET.get('start', ''), '%Y-%m-%d').date()
+    except ValueError:
+        start = today - timedelta(days=89)
+    try:
+        end = datetime.strptime(request.GET.get('end', ''), '%Y-%m-%d').date()
+    except ValueError:
+        end = today
+    if start > end:
+        start, end = end, start
+    
+    metric = request.GET.get('metric', 'bookings')
+    if metric not in dict(METRICS):
+        metric = 'bookings'
+    
+    matrix = occupancy_matrix(start, end)
+    totals = matrix['totals']
+    
+    context = {
+        'start': start,
+        'end': end,
+        'metric': metric,
+        'metrics': METRICS,
+        'slots': matrix['slots'],
+        'rows': heatmap_rows(matrix, metric),
+        'totals': totals,
+        'no_show_rate': round(100 * totals['no_shows'] / totals['bookings'], 1) if totals['bookings'] else 0,
+    }
+    return render(request, 'main/admin/occupancy.html', context)
+
+
+@login_required
+@user_passes_test(is_staff)
+def admin_export(request, kind):
+    """Download orders, order lines or reservations as CSV/JSON Lines"""
+    if kind not in EXPORTS:
+        messages.error(request, 'Unknown export!')
+        return redirect('main:admin_dashboard')
+    
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in FORMATS:
+        fmt = 'csv'
+    compress = request.GET.get('gzip') == '1'
+    
+    start = end = None
+    try:
+        if request.GET.get('start'):
+            start = datetime.strptime(request.GET['start'], '%Y-%m-%d').date()
+        if request.GET.get('end'):
+            end = datetime.strptime(request.GET['end'], '%Y-%m-%d').date()
+    except ValueError:
+        messages.error(request, 'Invalid date format!')
+        return redirect('main:admin_dashboard')
+    
+    content_type, extension = FORMATS[fmt]
+    filename = f'{kind}.{extension}'
+    if compress:
+        content_type = 'application/gzip'
+        filename += '.gz'
+    
+    response = StreamingHttpResponse(
+        stream_export(kind, fmt, start, end, request.GET.get('status') or None, compress),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+@user_passes_test(is_staff)
+def admin_profiles(request):
+    """Stored request profiles, newest first"""
+    context = {
+        'reports': list_reports(),
+        'query_param': settings.PROFILER_QUERY_PARAM,
+    }
+    return render(request, 'main/admin/profiles.html', context)
+
+
+@login_required
+@user_passes_test(is_staff)
+def admin_profile_detail(request, report_id):
+    """One request profile: SQL queries with their origin and the hottest functions"""
+    report = load_report(report_id)
+    if report is None:
+        messages.error(request, 'Profile not found!')
+        return redirect('main:admin_profiles')
+    return render(request, 'main/admin/profile_detail.html', {'report': report})
+
+
+def metrics(request):
+    """Request metrics in Prometheus text format, for staff or a METRICS_TOKEN bearer"""
+    token = settings.METRICS_TOKEN
+    authorized = bool(token) and request.headers.get('Authorization') == f'Bearer {token}'
+    if not authorized and not is_staff(request.user):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(render_prometheus(collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@login_required
+@user_passes_test(is_staff)
+async def kitchen_feed(request):
+    """Stream new orders and status changes to kitchen screens (Server-Sent Events)"""
+    if not settings.KITCHEN_FEED_ENABLED:
+        # Only an ASGI server can hold the stream open without tying up a worker
+        raise Http404('The kitchen feed is not enabled')
+    
+    async def stream():
+        yield 'retry: 3000\n\n'
+        async for event in get_broker().subscribe():
+            yield format_sse(event)
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx buffering the stream
+    return response
+
+
+def _selected_ids(request, field):
+    """Read a list of integer ids from a POSTed checkbox field"""
+    return [int(value) for value in request.POST.getlist(field) if value.isdigit()]
+
+
+def _filtered_list_url(request, view_name, **filters):
+    """URL of a staff list with the filters POSTed back by its bulk form (filter name -> POST field)"""
+    query = {name: request.POST.get(field, '') for name, field in filters.items()}
+    query = urlencode({name: value for name, value in query.items() if value})
+    url = reverse(view_name)
+    return f'{url}?{query}' if query else url
+
+
+@login_required
+@user_passes_test(is_staff)
+def admin_bulk_update_orders(request):
+    """Update the status of many orders at once"""
+    redirect_url = _filtered_list_url(request, 'main:admin_orders', status='status_filter')
+    
+    if request.method == 'POST':
+        order_ids = _selected_ids(request, 'order_ids')
+        new_status = request.POST.get('status')
+        
+        if not order_ids:
+            messages.warning(request, 'No orders selected!')
+            return redirect(redirect_url)
+        
+        try:
+            updated = bulk_update_order_status(Order.objects.filter(id__in=order_ids), new_status)
+        except ValueError:
+            messages.error(request, 'Invalid order status!')
+            return redirect(redirect_url)
+        
+        messages.success(request, f'{updated} order(s) updated successfully!')
+    
+    return redirect(redirect_url)
+
+
 @login_required
 @user_passes_test(is_staff)
 def admin_reservations(request):
@@ -678,7 +973,7 @@ def admin_reservations(request):
     status_filter = request.GET.get('status', '')
     date_filter = request.GET.get('date', '')
     
-    reservations = Reservation.objects.all()
+    reservations = Reservation.objects.select_related('user')
     
     if status_filter:
         reservations = reservations.filter(status=status_filter)
@@ -721,11 +1016,41 @@ def admin_update_reservation_status(request, reservation_id):
                     f'Hi {user_name},\n\nYour reservation status has been updated to: {reservation.get_status_display()}\n\nReservation Number: {reservation.reservation_number}',
                     settings.DEFAULT_FROM_EMAIL,
                     [user_email],
-                    fail_silently=True,
                 )
-            except:
-                pass
+            except Exception:
+                logger.exception(
+                    'Reservation status email failed', extra={'reservation_number': reservation.reservation_number},
+                )
         
         messages.success(request, 'Reservation status updated successfully!')
     
     return redirect('main:admin_reservations')
+
+
+@login_required
+@user_passes_test(is_staff)
+def admin_bulk_update_reservations(request):
+    """Update the status of many reservations at once"""
+    redirect_url = _filtered_list_url(
+        request, 'main:admin_reservations', status='status_filter', date='date_filter'
+    )
+    
+    if request.method == 'POST':
+        reservation_ids = _selected_ids(request, 'reservation_ids')
+        new_status = request.POST.get('status')
+        
+        if not reservation_ids:
+            messages.warning(request, 'No reservations selected!')
+            return redirect(redirect_url)
+        
+        try:
+            updated = bulk_update_reservation_status(
+                Reservation.objects.filter(id__in=reservation_ids), new_status
+            )
+        except ValueError:
+            messages.error(request, 'Invalid reservation status!')
+            return redirect(redirect_url)
+        
+        messages.success(request, f'{updated} reservation(s) updated successfully!')
+    
+    return redirect(redirect_url)
@@ -2,9 +2,13 @@
 Web3Forms Email Integration
 Send confirmation emails via Web3Forms API
 """
-import requests
+import logging
 import json
 
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
 
 def send_web3forms_email(access_key, to_email, subject, message, from_name="Restaurant"):
     """
@@ -20,6 +24,10 @@ def send_web3forms_email(access_key, to_email, subject, message, from_name="Rest
     Returns:
         dict: Response from Web3Forms API
     """
+    # requests (with urllib3 and ssl) is only needed when an email is sent,
+    # importing it here keeps it off the cold start path
+    import requests
+
     url = "https://api.web3forms.com/submit"
     
     data = {
@@ -31,10 +39,12 @@ def send_web3forms_email(access_key, to_email, subject, message, from_name="Rest
     }
     
     try:
-        response = requests.post(url, json=data)
+        with timed('notification_duration_seconds', channel='web3forms'):
+            response = requests.post(url, json=data)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
+        logger.warning('Web3Forms request failed: %s', e, extra={'subject': subject})
         return {"success": False, "error": str(e)}
 
 
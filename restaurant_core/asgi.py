@@ -2,6 +2,8 @@
 ASGI config for restaurant_core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn restaurant_core.asgi:application``)
+for the streaming kitchen feed at /admin-orders/feed/ (set KITCHEN_FEED_ENABLED=1).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
@@ -41,23 +41,32 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main.middleware.RequestIdMiddleware',
+    'main.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'main.middleware.ProfilerMiddleware',
+    'main.middleware.NPlusOneMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'restaurant_core.urls'
 
+# Loaders for TEMPLATES below (not a Django setting)
+_TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'main.metrics.InstrumentedDjangoTemplates',  # DjangoTemplates with render timing
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
@@ -65,6 +74,8 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
                 'django.template.context_processors.media',
             ],
+            # Compile each template once per process in production, re-read on every render while developing
+            'loaders': _TEMPLATE_LOADERS if DEBUG else [('django.template.loaders.cached.Loader', _TEMPLATE_LOADERS)],
         },
     },
 ]
@@ -76,6 +87,7 @@ WSGI_APPLICATION = 'restaurant_core.wsgi.application'
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
 import os
+import tempfile
 
 # Check if we're on Vercel (production)
 if os.environ.get('VERCEL'):
@@ -158,10 +170,109 @@ LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 
+# Cache (menu rankings, menu cards, receipts, occupancy)
+# Shared by every worker and by management commands, so the invalidation done
+# by the admin, menu_sync and image_sync reaches all of them. The database
+# cache table is created by migration 0014 (manage.py migrate). Set REDIS_URL
+# to use Redis instead (requires the redis package).
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+        }
+    }
+
 # Session settings
 SESSION_COOKIE_AGE = 86400  # 24 hours
 SESSION_SAVE_EVERY_REQUEST = True
 
+# Kitchen order feed (Server-Sent Events at /admin-orders/feed/)
+# The feed is an endless response: enable it only where restaurant_core.asgi is
+# served by an ASGI server. Under WSGI (Vercel, gunicorn) each open screen would
+# hold a worker forever, so the feed answers 404 and the pages don't connect.
+KITCHEN_FEED_ENABLED = os.environ.get('KITCHEN_FEED_ENABLED', '0') == '1'
+# LocalBroker only reaches screens connected to the same process; switch to
+# 'main.events.RedisBroker' with OPTIONS {'url': 'redis://...'} for several workers.
+KITCHEN_EVENTS = {
+    'BACKEND': 'main.events.LocalBroker',
+    'OPTIONS': {},
+}
+
+PREP_QUEUE_REFRESH_SECONDS = 30  # Reload the in-memory prep queue at least this often
+
+# Maintenance jobs (python manage.py run_maintenance)
+MAINTENANCE_DELIVERED_ORDER_HOURS = 6  # Delivered orders are completed after this many hours
+
+ARCHIVE_ORDERS_AFTER_DAYS = 180  # Completed/cancelled orders move to the archive tables after this
+
+# Home page featured/popular items (refreshed by the refresh_menu_rankings job)
+RANKING_WINDOW_DAYS = 30
+RANKING_HALF_LIFE_DAYS = 7
+
+# Kitchen prep forecast (requires numpy)
+FORECAST_HISTORY_WEEKS = 104  # Weeks of order history used
+FORECAST_SMOOTHING = 0.3  # Exponential smoothing factor across weeks
+FORECAST_SAFETY_MARGIN = 0.1  # Prep 10% more than forecast
+
+# Cold start (see main/startup.py and the profile_startup command)
+# Warm-up makes boot + first request slower overall (it only helps when the
+# process boots before traffic arrives), and on Vercel boot happens inside the
+# first request, so it is off unless a long-running server asks for it
+WARMUP_ON_BOOT = os.environ.get('WARMUP_ON_BOOT', '0') == '1'  # Compile templates and prime caches in wsgi.py
+STARTUP_TARGET_SECONDS = 1.0  # Boot + first request
+
+# Logging: JSON lines on stderr, written by a background thread (see main/log.py)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+REQUEST_ID_HEADER_TRUSTED = os.environ.get('REQUEST_ID_HEADER_TRUSTED', '') == '1'  # Reuse the proxy's X-Request-ID
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'main.log.JsonFormatter'},
+    },
+    'filters': {
+        'request_id': {'()': 'main.log.RequestIdFilter'},
+    },
+    'handlers': {
+        'background': {
+            '()': 'main.log.BackgroundHandler',
+            'formatter': 'json',
+            'filters': ['request_id'],
+        },
+    },
+    'root': {'handlers': ['background'], 'level': LOG_LEVEL},
+    'loggers': {
+        'django': {'handlers': ['background'], 'level': LOG_LEVEL, 'propagate': False},
+    },
+}
+
+# Request metrics (Prometheus text format at /metrics, staff or METRICS_TOKEN bearer only)
+# With several worker processes set METRICS_MULTIPROCESS_DIR to a directory shared by the workers
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_MULTIPROCESS_DIR = os.environ.get('METRICS_MULTIPROCESS_DIR', '')
+METRICS_FLUSH_SECONDS = 1
+
+# On-demand request profiling (staff add ?profile=1 or an X-Profile header, see main/profiling.py)
+# The deployment bundle is read-only on Vercel, only the temp directory can be written there
+PROFILER_DIR = os.environ.get('PROFILER_DIR') or (
+    os.path.join(tempfile.gettempdir(), 'profiles') if os.environ.get('VERCEL') else BASE_DIR / 'profiles'
+)
+PROFILER_KEEP = 50  # Newest reports kept
+PROFILER_QUERY_PARAM = 'profile'
+PROFILER_SAMPLE_RATE = 0  # Also profile this fraction of all requests (e.g. 0.001), 0 disables sampling
+
+# N+1 query detection (see main/nplusone.py), logged as warnings on the main.nplusone logger
+NPLUSONE_SAMPLE_RATE = float(os.environ.get('NPLUSONE_SAMPLE_RATE', '0.01'))  # Fraction of requests tracked
+NPLUSONE_THRESHOLD = 5  # Report a query run this many times in one request
+
 # Email configuration (Console backend for development)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 EMAIL_HOST = 'localhost'
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'restaurant_core.settings')
 
 application = get_wsgi_application()
+
+if settings.WARMUP_ON_BOOT:
+    # Do the first request's one-off work now (see main/startup.py)
+    from main.startup import warm_up
+    warm_up()